@@ -1,25 +1,83 @@
-from steps.step3_recommend import find_similars, find_competitors
-from steps.step4_attractiveness import predict_attractiveness
-import pandas as pd
+# step 3(scikit-learn/scipy)와 모델 배열(numba)은 단계를 실행할 때만 import (UI 시작 시간 단축)
+from steps.step4_attractiveness import FEATURE_VERSION, INPUT_COLUMNS
+from steps.prediction_cache import model_version
+from steps.pipeline import Stage, run_pipeline
 
-def main():
+SIMILARITY_INDEX_DIR = "./data/similarity_index"
+MODEL_PATH = "./steps/rf_weighted_model.pkl"
+ENCODER_PATH = "./steps/ordinal_encoder.pkl"
+COMPILED_MODEL_DIR = "./steps/rf_compiled"
+PREDICTION_CACHE_PATH = "./data/prediction_cache.npz"
+CHECKPOINT_DIR = "./data/pipeline_cache"
+CATALOG_STORE_DIR = "./data/catalog_store"
+PAGE_CACHE_DIR = "./data/page_cache"
+CRAWL_JOURNAL_PATH = "./data/crawl_journal.jsonl"
+CRAWL_COLUMNS = ['네티즌 평점', '네이버 관심도(찜)', '누적 관객수']
 
-    file_path = "./data/영화DB(임시).csv"
 
-    # step 1
+def build_stages(rebuild_index=False, n_jobs=1, crawl=False):
+    """step 2~4를 (입력 컬럼 → 출력 컬럼) 단계로 선언합니다."""
+
+    def crawl_stage(df):
+        # HTTP 우선 크롤러 (브라우저가 필요한 페이지만 Selenium), 크롤링할 때만 import
+        from steps.naver_async import crawl_missing
+        from steps.page_cache import PageCache
+        from steps.crawl_journal import CrawlJournal
+        crawled = crawl_missing(df, cache=PageCache(PAGE_CACHE_DIR), journal=CrawlJournal(CRAWL_JOURNAL_PATH))
+        return {col: crawled[col] for col in CRAWL_COLUMNS}
+
+    def similars_stage(df):
+        from steps.similarity_index import update_similars
+        return {'유사작': update_similars(df, SIMILARITY_INDEX_DIR, rebuild=rebuild_index, n_jobs=n_jobs)}
+
+    def competitors_stage(df):
+        from steps.step3_recommend import find_competitors
+        return {'경쟁작': find_competitors(df, n_jobs=n_jobs)}
+
+    def attractiveness_stage(df):
+        from steps.forest_export import export_forest, is_current
+        from steps.step4_attractiveness import predict_attractiveness
+        if not is_current(COMPILED_MODEL_DIR, MODEL_PATH, ENCODER_PATH):
+            export_forest(MODEL_PATH, ENCODER_PATH, COMPILED_MODEL_DIR)
+        return {'예측 매력도': predict_attractiveness(df, encoder_path = ENCODER_PATH, model_path = MODEL_PATH,
+                                                 compiled_dir = COMPILED_MODEL_DIR,
+                                                 cache_path = PREDICTION_CACHE_PATH)}
 
-    # step 2
+    return [
+        # step 2
+        Stage('step2_crawl', crawl_stage, ['영화명'] + CRAWL_COLUMNS, CRAWL_COLUMNS, enabled=crawl),
+        # step 3
+        Stage('step3_similars', similars_stage, ['영화명', 'Gemini 키워드', '매력도'], ['유사작']),
+        Stage('step3_competitors', competitors_stage, ['영화명', '개봉일'], ['경쟁작']),
+        # step 4
+        Stage('step4_attractiveness', attractiveness_stage, INPUT_COLUMNS, ['예측 매력도'],
+              version=lambda: f"{model_version(MODEL_PATH, ENCODER_PATH)}:{FEATURE_VERSION}"),
+    ]
 
-    # step 3
-    df = pd.read_csv(file_path)
-    df['유사작'] = find_similars(df)
-    df['경쟁작'] = find_competitors(df)
-    df.to_csv(file_path, index=False, encoding='utf-8-sig')
 
-    # step 4
-    df = pd.read_csv(file_path)
-    df['예측 매력도'] = predict_attractiveness(df, encoder_path = './steps/ordinal_encoder.pkl', model_path = './steps/rf_weighted_model.pkl')
-    df.to_csv(file_path, index=False, encoding='utf-8-sig')
+def main(rebuild_index=False, n_jobs=1, crawl=False, on_stage=None):
+    """
+    rebuild_index=True이면 유사작 인덱스를 증분 갱신하지 않고 전체 재구축합니다.
+    n_jobs > 1 (또는 -1)이면 step 3을 여러 프로세스로 나누어 계산합니다.
+    crawl=True이면 step 2(네이버 크롤링)도 실행합니다. (자바스크립트가 필요한 페이지는 selenium 사용)
+    CSV는 한 번 읽고 마지막에 한 번만 쓰며, 입력이 바뀌지 않은 단계는 체크포인트를 재사용합니다.
+    on_stage(이름, 상태, 소요 초)는 단계 진행 상황 콜백입니다.
+    """
+
+    file_path = "./data/영화DB(임시).csv"
+
+    # step 1
+
+    # step 2 ~ 4
+    stages = build_stages(rebuild_index=rebuild_index, n_jobs=n_jobs, crawl=crawl)
+    force = ['step3_similars'] if rebuild_index else []
+    df, report = run_pipeline(stages, file_path, checkpoint_dir=CHECKPOINT_DIR, force=force, on_stage=on_stage,
+                              store_dir=CATALOG_STORE_DIR)
+    if crawl:
+        # 크롤링 결과가 카탈로그에 저장되었으므로 기록 정리
+        from steps.crawl_journal import CrawlJournal
+        CrawlJournal(CRAWL_JOURNAL_PATH).clear()
+    return report
 
 if __name__ == "__main__":
 
@@ -0,0 +1,170 @@
+import io
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+SCHEMA_FILE = 'schema.json'
+STORE_VERSION = 1
+# CSV를 직접 읽어야 할 때 시도하는 인코딩 순서
+CSV_ENCODINGS = ("utf-8-sig", "cp949", "utf-8")
+
+
+def read_csv_any(path, **kwargs):
+    """인코딩을 순서대로 시도하여 CSV를 읽습니다."""
+    for enc in CSV_ENCODINGS:
+        try:
+            return pd.read_csv(path, encoding=enc, **kwargs)
+        except UnicodeDecodeError:
+            continue
+    return pd.read_csv(path, **kwargs)
+
+
+def _signature(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def csv_roundtrip(df, columns):
+    """
+    columns를 메모리에서 CSV로 썼다가 다시 읽은 값으로 바꿉니다.
+    파이프라인이 새로 만든 컬럼도 CSV를 다시 읽었을 때와 같은 타입/값(결측 문자열, 실수 파싱 등)으로 저장하기 위함입니다.
+    """
+    columns = [c for c in columns if c in df.columns]
+    if not columns:
+        return df
+    df = df.copy()
+    text = df[columns].to_csv(index=False)
+    parsed = pd.read_csv(io.StringIO(text))
+    for col in columns:
+        df[col] = parsed[col].to_numpy()
+    return df
+
+
+def save_catalog(df, store_dir, source_path=None):
+    """
+    카탈로그를 컬럼 단위 바이너리 저장소(store_dir)로 저장합니다.
+    - 숫자 컬럼: 고정 폭 numpy 배열 하나 (c{번호}.npy)
+    - 문자열 컬럼: 모든 값을 이어 붙인 UTF-8 바이트(.data.npy) + 문자 단위 시작 위치(.offsets.npy, 행 수+1)
+                   + 결측 여부(.null.npy)
+    source_path(원본 CSV)의 수정 시각/크기를 함께 기록하여 CSV가 바뀌면 다시 만들도록 합니다.
+    """
+    tmp_dir = store_dir.rstrip('/\\') + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    columns = []
+    for i, col in enumerate(df.columns):
+        series = df[col]
+        base = os.path.join(tmp_dir, f'c{i}')
+        if pd.api.types.is_numeric_dtype(series.dtype) and series.dtype != object:
+            values = series.to_numpy()
+            np.save(base + '.npy', values)
+            columns.append({'name': col, 'kind': 'numeric', 'dtype': values.dtype.str, 'file': f'c{i}'})
+        else:
+            values = series.to_numpy(dtype=object)
+            null = pd.isna(values)
+            texts = ['' if missing else str(v) for v, missing in zip(values, null)]
+            offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+            np.cumsum(np.fromiter(map(len, texts), dtype=np.int64, count=len(texts)), out=offsets[1:])
+            np.save(base + '.data.npy', np.frombuffer(''.join(texts).encode('utf-8'), dtype=np.uint8))
+            np.save(base + '.offsets.npy', offsets)
+            np.save(base + '.null.npy', null)
+            columns.append({'name': col, 'kind': 'string', 'dtype': str(series.dtype), 'file': f'c{i}'})
+
+    schema = {
+        'version': STORE_VERSION,
+        'n_rows': len(df),
+        'columns': columns,
+        'source': _signature(source_path) if source_path else None,
+    }
+    with open(os.path.join(tmp_dir, SCHEMA_FILE), 'w', encoding='utf-8') as f:
+        json.dump(schema, f, ensure_ascii=False)
+
+    old_dir = store_dir.rstrip('/\\') + '.old'
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.exists(store_dir):
+        os.replace(store_dir, old_dir)
+    os.replace(tmp_dir, store_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return schema
+
+
+class CatalogStore:
+    """save_catalog로 만든 저장소. 컬럼 파일은 필요할 때만 메모리 맵으로 엽니다."""
+
+    def __init__(self, store_dir, schema):
+        self.store_dir = store_dir
+        self.schema = schema
+        self._columns = {c['name']: c for c in schema['columns']}
+
+    @classmethod
+    def open(cls, store_dir):
+        """저장소를 엽니다. 없거나 형식 버전이 다르면 None"""
+        path = os.path.join(store_dir, SCHEMA_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as f:
+            schema = json.load(f)
+        if schema.get('version') != STORE_VERSION:
+            return None
+        return cls(store_dir, schema)
+
+    @property
+    def columns(self):
+        return [c['name'] for c in self.schema['columns']]
+
+    def __len__(self):
+        return self.schema['n_rows']
+
+    def is_current(self, source_path):
+        """source_path(CSV)가 저장 이후 바뀌지 않았는지"""
+        return (self.schema['source'] is not None and os.path.exists(source_path)
+                and self.schema['source'] == _signature(source_path))
+
+    def _array(self, name, suffix):
+        return np.load(os.path.join(self.store_dir, self._columns[name]['file'] + suffix), mmap_mode='r')
+
+    def string_parts(self, name):
+        """문자열 컬럼의 (이어 붙인 전체 문자열, 문자 단위 offsets, 결측 여부)"""
+        text = self._array(name, '.data.npy').tobytes().decode('utf-8')
+        return text, self._array(name, '.offsets.npy'), self._array(name, '.null.npy')
+
+    def column(self, name):
+        """숫자 컬럼은 메모리 맵 배열, 문자열 컬럼은 object 배열(결측은 NaN)"""
+        if self._columns[name]['kind'] == 'numeric':
+            return self._array(name, '.npy')
+        text, offsets, null = self.string_parts(name)
+        bounds = offsets.tolist()
+        values = np.empty(len(null), dtype=object)
+        values[:] = [text[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+        values[np.asarray(null)] = np.nan
+        return values
+
+    def to_frame(self, columns=None):
+        """columns(기본: 전체)만 읽어 DataFrame으로 만듭니다."""
+        names = self.columns if columns is None else [c for c in columns if c in self._columns]
+        data = {}
+        for name in names:
+            values = self.column(name)
+            # 문자열 컬럼의 dtype은 read_csv와 같이 pandas 기본 추론에 맡김
+            data[name] = np.array(values) if self._columns[name]['kind'] == 'numeric' else values
+        return pd.DataFrame(data, index=pd.RangeIndex(len(self)))
+
+
+def load_catalog(csv_path, store_dir, columns=None):
+    """
+    카탈로그를 읽습니다. store_dir의 저장소가 csv_path와 같은 내용이면 저장소에서 columns만 읽고,
+    아니면 CSV를 읽어 저장소를 새로 만든 뒤 반환합니다. (저장소를 쓸 수 없는 환경이면 CSV 결과만 반환)
+    """
+    store = CatalogStore.open(store_dir)
+    if store is not None and store.is_current(csv_path):
+        return store.to_frame(columns)
+    df = read_csv_any(csv_path)
+    try:
+        save_catalog(df, store_dir, csv_path)
+    except OSError:
+        pass
+    return df if columns is None else df[[c for c in columns if c in df.columns]]
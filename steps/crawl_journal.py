@@ -0,0 +1,128 @@
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_JOURNAL_PATH = "./data/crawl_journal.jsonl"
+# 이 개수만큼 쌓일 때마다 디스크에 기록 (중단 시 잃는 작업은 최대 이만큼)
+DEFAULT_FLUSH_EVERY = 50
+CRAWL_COLUMNS = ['네티즌 평점', '네이버 관심도(찜)', '누적 관객수']
+# 다시 시도해야 하는 결과 (재시작 시 건너뛰지 않음)
+UNRESOLVED = {'Error'}
+
+
+class CrawlJournal:
+    """
+    크롤링 결과를 제목 단위로 한 줄씩 덧붙이는 JSONL 기록.
+    flush_every건마다 파일에 쓰고 fsync하므로, 중간에 프로세스가 죽어도 그 전까지의 결과는 남습니다.
+    재시작하면 apply()로 이미 받은 결과를 채워 넣고 나머지만 크롤링하면 됩니다.
+    여러 크롤링 스레드에서 함께 사용할 수 있습니다.
+    """
+
+    def __init__(self, path=DEFAULT_JOURNAL_PATH, flush_every=DEFAULT_FLUSH_EVERY):
+        self.path = path
+        self.flush_every = flush_every
+        self._buffer = []
+        self._lock = threading.Lock()
+
+    def entries(self):
+        """{제목: (평점, 관심도, 관객수)} — 같은 제목은 마지막 기록이 우선. 끝이 잘린 줄은 무시"""
+        results = {}
+        if not os.path.exists(self.path):
+            return results
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue        # 기록 도중 중단된 마지막 줄
+                results[entry['title']] = tuple(entry['result'])
+        return results
+
+    def resolved(self):
+        """다시 크롤링할 필요가 없는 결과만"""
+        return {t: r for t, r in self.entries().items() if not UNRESOLVED.intersection(r)}
+
+    def record(self, title, result):
+        with self._lock:
+            self._buffer.append(json.dumps({'title': title, 'result': list(result), 'at': time.time()},
+                                           ensure_ascii=False))
+            if len(self._buffer) >= self.flush_every:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._buffer:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, 'a+b') as f:
+            # 지난 실행이 줄 중간에서 끊겼다면 새 줄부터 이어 쓰기
+            f.seek(0, os.SEEK_END)
+            prefix = b''
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                prefix = b'' if f.read(1) == b'\n' else b'\n'
+            f.write(prefix + ('\n'.join(self._buffer) + '\n').encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+        self._buffer = []
+
+    def apply(self, df, title_column='영화명'):
+        """
+        '네티즌 평점'이 비어 있는 행 중 기록에 해결된 결과가 있는 행을 채운 DataFrame과 채운 행 수를 반환합니다.
+        """
+        resolved = self.resolved()
+        df = df.copy()
+        for col in CRAWL_COLUMNS:
+            if col not in df.columns: df[col] = np.nan
+            df[col] = df[col].astype(object)
+        rows = df.index[df[CRAWL_COLUMNS[0]].isna() & df[title_column].isin(list(resolved))]
+        for index in rows:
+            for col, value in zip(CRAWL_COLUMNS, resolved[df.at[index, title_column]]):
+                df.at[index, col] = value
+        return df, len(rows)
+
+    def compact(self):
+        """제목마다 마지막 기록만 남기도록 파일을 다시 씁니다. (임시 파일 후 교체)"""
+        self.flush()
+        entries = self.entries()
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for title, result in entries.items():
+                f.write(json.dumps({'title': title, 'result': list(result)}, ensure_ascii=False) + '\n')
+        os.replace(tmp_path, self.path)
+        return len(entries)
+
+    def clear(self):
+        """결과가 카탈로그에 반영된 뒤 기록을 비웁니다."""
+        with self._lock:
+            self._buffer = []
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+def merge_into_catalog(csv_path, journal_path=DEFAULT_JOURNAL_PATH):
+    """
+    기록을 카탈로그 CSV에 합치고(비어 있는 행만) 기록을 비웁니다.
+    CSV는 임시 파일에 쓴 뒤 교체하므로, 합치는 도중 중단되어도 기록과 CSV 모두 그대로 남습니다.
+    """
+    journal = CrawlJournal(journal_path)
+    df, filled = journal.apply(pd.read_csv(csv_path))
+    tmp_path = csv_path + '.tmp'
+    df.to_csv(tmp_path, index=False, encoding='utf-8-sig')
+    os.replace(tmp_path, csv_path)
+    journal.clear()
+    return filled
+
+
+if __name__ == "__main__":
+    # 사용법: python -m steps.crawl_journal <카탈로그 CSV> [기록 파일]
+    filled = merge_into_catalog(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else DEFAULT_JOURNAL_PATH)
+    print(f"✨ 크롤링 기록 {filled:,}건을 '{sys.argv[1]}'에 반영했습니다.")
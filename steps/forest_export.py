@@ -0,0 +1,236 @@
+import json
+import math
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from steps import model_registry
+
+# numba가 있으면 트리 순회를 기계어로 컴파일하고, 없으면 numpy 벡터 순회를 사용
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except Exception:
+    HAS_NUMBA = False
+
+# 한 번에 순회하는 행 수 (행 × 트리 수 크기의 중간 배열 메모리를 제한)
+PREDICT_BATCH = 4096
+
+_ARRAYS = ['feature', 'threshold', 'left', 'right', 'value', 'missing_left', 'roots']
+
+
+def export_forest(model_path, encoder_path, out_dir):
+    """
+    RandomForestRegressor와 OrdinalEncoder를 연속된 numpy 배열 묶음(out_dir/*.npy + meta.json)으로 내보냅니다.
+    모든 트리의 노드를 하나의 배열로 이어 붙이고, 리프 노드는 자기 자신을 자식으로 가리키게 하여
+    고정 횟수(max_depth)의 벡터 순회만으로 리프에 도달하도록 만듭니다.
+    """
+    model, ord = model_registry.load_pair(model_path, encoder_path)
+
+    feature, threshold, left, right, value, missing_left, roots = [], [], [], [], [], [], []
+    offset = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        node_ids = np.arange(tree.node_count)
+        is_leaf = tree.children_left < 0
+        roots.append(offset)
+        feature.append(np.where(is_leaf, 0, tree.feature))
+        threshold.append(tree.threshold)
+        left.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+        right.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+        value.append(tree.value[:, 0, 0])
+        missing_left.append(np.asarray(getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count)), dtype=bool))
+        offset += tree.node_count
+
+    arrays = {
+        'feature': np.concatenate(feature).astype(np.int32),
+        'threshold': np.concatenate(threshold).astype(np.float64),
+        'left': np.concatenate(left).astype(np.int32),
+        'right': np.concatenate(right).astype(np.int32),
+        'value': np.concatenate(value).astype(np.float64),
+        'missing_left': np.concatenate(missing_left),
+        'roots': np.asarray(roots, dtype=np.int32),
+    }
+
+    # 인코더는 컬럼별 범주 목록으로 보관 (학습 시 결측치가 범주였다면 그 위치를 따로 기록)
+    categories = {}
+    missing_codes = {}
+    for col, cats in zip(ord.feature_names_in_, ord.categories_):
+        values = [c for c in cats.tolist() if not (isinstance(c, float) and math.isnan(c))]
+        categories[str(col)] = values
+        if len(values) != len(cats) and len(getattr(ord, '_missing_indices', {})):
+            missing_codes[str(col)] = None if np.isnan(ord.encoded_missing_value) else float(ord.encoded_missing_value)
+
+    meta = {
+        'n_trees': len(model.estimators_),
+        'max_depth': int(max(e.tree_.max_depth for e in model.estimators_)),
+        'feature_names': [str(f) for f in model.feature_names_in_],
+        'categories': categories,
+        'missing_codes': missing_codes,
+        'unknown_value': float(ord.unknown_value) if ord.unknown_value is not None else None,
+        'model_version': model_registry.file_version(model_path),
+        'encoder_version': model_registry.file_version(encoder_path),
+    }
+
+    tmp_dir = out_dir.rstrip('/\\') + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp_dir, f'{name}.npy'), array)
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+    return meta
+
+
+def is_current(out_dir, model_path, encoder_path):
+    """내보낸 배열이 현재 모델/인코더 파일에서 만들어진 것인지 확인"""
+    meta_path = os.path.join(out_dir, 'meta.json')
+    if not os.path.exists(meta_path):
+        return False
+    with open(meta_path, encoding='utf-8') as f:
+        meta = json.load(f)
+    return (meta['model_version'] == model_registry.file_version(model_path)
+            and meta['encoder_version'] == model_registry.file_version(encoder_path))
+
+
+if HAS_NUMBA:
+    @njit(cache=True, nogil=True)
+    def _traverse(X, feature, threshold, left, right, value, missing_left, roots, out):
+        # sklearn과 같이 트리 단위로 모든 행을 순회 (한 트리의 노드가 캐시에 머무름)
+        n_trees = roots.shape[0]
+        out[:] = 0.0
+        for t in range(n_trees):
+            for i in range(X.shape[0]):
+                node = roots[t]
+                while left[node] != node:          # 리프는 자기 자신을 가리킴
+                    x = X[i, feature[node]]
+                    if x != x:                     # NaN
+                        node = left[node] if missing_left[node] else right[node]
+                    elif x <= threshold[node]:
+                        node = left[node]
+                    else:
+                        node = right[node]
+                out[i] += value[node]
+        for i in range(X.shape[0]):
+            out[i] /= n_trees
+
+
+class CompiledForest:
+    """export_forest로 내보낸 배열을 메모리 맵으로 열어 sklearn 없이 예측하는 평가기"""
+
+    def __init__(self, arrays, meta):
+        self.arrays = arrays
+        self.meta = meta
+        self.feature_names = meta['feature_names']
+        self._lookups = {col: pd.Index(cats) for col, cats in meta['categories'].items()}
+        self._children = None
+
+    @classmethod
+    def load(cls, out_dir, mmap_mode='r'):
+        with open(os.path.join(out_dir, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        arrays = {name: np.load(os.path.join(out_dir, f'{name}.npy'), mmap_mode=mmap_mode) for name in _ARRAYS}
+        return cls(arrays, meta)
+
+    def encode(self, x):
+        """인코딩 전 특성(DataFrame)을 모델 입력 배열로 변환 (범주형은 범주 목록 위치 조회)"""
+        out = np.empty((len(x), len(self.feature_names)), dtype=np.float64)
+        unknown = self.meta['unknown_value']
+        for j, col in enumerate(self.feature_names):
+            if col in self._lookups:
+                values = x[col].to_numpy(dtype=object)
+                codes = self._lookups[col].get_indexer(values).astype(np.float64)
+                codes[codes < 0] = np.nan if unknown is None else unknown
+                if col in self.meta['missing_codes']:
+                    missing = self.meta['missing_codes'][col]
+                    codes[pd.isna(values)] = np.nan if missing is None else missing
+                out[:, j] = codes
+            else:
+                out[:, j] = pd.to_numeric(x[col], errors='coerce').to_numpy(dtype=np.float64)
+        return out
+
+    def predict(self, X):
+        """모델 입력 배열(n, 특성 수)의 예측값. sklearn과 같이 float32 입력 / 트리 순서대로 합산 후 평균"""
+        if HAS_NUMBA:
+            a = self.arrays
+            X = np.ascontiguousarray(X, dtype=np.float32)
+            out = np.empty(len(X))
+            _traverse(X, a['feature'], a['threshold'], a['left'], a['right'], a['value'],
+                      a['missing_left'], a['roots'], out)
+            return out
+        return self._predict_numpy(X)
+
+    def _predict_numpy(self, X):
+        """numba가 없을 때의 벡터 순회: (행, 트리) 전체를 max_depth번 한 단계씩 내려감"""
+        a = self.arrays
+        if self._children is None:
+            self._children = np.stack([a['right'], a['left']])   # children[왼쪽으로 가는지, 노드]
+        X = np.asarray(X, dtype=np.float32)
+        out = np.empty(len(X))
+        n_trees = self.meta['n_trees']
+        for start in range(0, len(X), PREDICT_BATCH):
+            block = X[start:start + PREDICT_BATCH]
+            has_nan = np.isnan(block).any()
+            flat = block.ravel()
+            base = (np.arange(len(block)) * block.shape[1])[:, None]
+            nodes = np.broadcast_to(a['roots'], (len(block), n_trees)).copy()
+            for _ in range(self.meta['max_depth']):
+                x = flat[base + a['feature'][nodes]]
+                go_left = x <= a['threshold'][nodes]
+                if has_nan:
+                    go_left = np.where(np.isnan(x), a['missing_left'][nodes], go_left)
+                nodes = self._children[go_left.view(np.uint8), nodes]
+            leaf = a['value'][nodes]
+            total = np.zeros(len(block))
+            for t in range(n_trees):
+                total += leaf[:, t]
+            out[start:start + PREDICT_BATCH] = total / n_trees
+        return out
+
+    def predict_features(self, x):
+        """prepare_features(..., ord=None)의 결과로 바로 예측"""
+        return self.predict(self.encode(x))
+
+
+def benchmark(df, model_path, encoder_path, out_dir, repeat=20):
+    """sklearn 경로와 배열 평가기의 단건/배치 처리량 비교표"""
+    from steps.step4_attractiveness import prepare_features
+
+    model, ord = model_registry.load_pair(model_path, encoder_path)
+    start = time.perf_counter()
+    forest = CompiledForest.load(out_dir)
+    load_ms = (time.perf_counter() - start) * 1000
+    raw = prepare_features(df, None)
+
+    def sklearn_predict(frame):
+        encoded = frame.copy()
+        encoded[list(forest._lookups)] = ord.transform(frame[list(forest._lookups)])
+        return model.predict(encoded)
+
+    rows = []
+    for label, frame in [('단건', raw.head(1)), ('배치', raw)]:
+        for engine, func in [('sklearn', sklearn_predict), ('compiled', forest.predict_features)]:
+            start = time.perf_counter()
+            for _ in range(repeat):
+                func(frame)
+            elapsed = (time.perf_counter() - start) / repeat
+            rows.append({'입력': label, 'engine': engine, 'rows': len(frame),
+                         'ms/call': round(elapsed * 1000, 3), 'rows/s': round(len(frame) / elapsed)})
+    diff = np.abs(sklearn_predict(raw) - forest.predict_features(raw)).max()
+    print(f"artifact load: {load_ms:.2f} ms, max |diff| = {diff:.3g}")
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    # 사용법: python -m steps.forest_export [출력 폴더]   (내보낸 뒤 영화DB로 벤치마크)
+    out = sys.argv[1] if len(sys.argv) > 1 else './steps/rf_compiled'
+    export_forest('./steps/rf_weighted_model.pkl', './steps/ordinal_encoder.pkl', out)
+    print(f"✅ 모델 배열을 '{out}'에 내보냈습니다.")
+    catalog = pd.read_csv('./data/영화DB(임시).csv')
+    print(benchmark(catalog, './steps/rf_weighted_model.pkl', './steps/ordinal_encoder.pkl', out).to_string(index=False))
@@ -0,0 +1,78 @@
+import hashlib
+import os
+import threading
+
+import joblib
+
+# 프로세스 전역 모델 캐시: (절대경로, 모드) -> (파일 서명, 객체)
+_cache = {}
+_versions = {}
+_lock = threading.Lock()
+
+
+def _signature(path):
+    """파일이 바뀌었는지 판단하는 서명 (수정 시각, 크기)"""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _cached(key, signature_path, loader):
+    signature = _signature(signature_path)
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+        obj = loader()
+        _cache[key] = (signature, obj)
+        return obj
+
+
+def load(path, mmap_mode=None):
+    """
+    joblib 파일을 프로세스당 한 번만 로드하여 재사용합니다.
+    파일의 수정 시각/크기가 바뀌면 자동으로 다시 로드합니다.
+    mmap_mode('r' 등)는 joblib.load에 그대로 전달되어, joblib으로 저장된 numpy 배열을
+    여러 작업 프로세스가 같은 메모리 맵으로 공유할 수 있습니다.
+    (일반 pickle로 저장된 파일이나 로드 시 배열을 복사하는 sklearn 트리에는 효과가 없습니다.)
+    """
+    path = os.path.abspath(path)
+    return _cached((path, mmap_mode), path, lambda: joblib.load(path, mmap_mode=mmap_mode))
+
+
+def load_compiled(out_dir):
+    """forest_export로 내보낸 배열 모델을 메모리 맵으로 열어 캐시 (meta.json이 바뀌면 다시 열기)"""
+    from steps.forest_export import CompiledForest
+
+    out_dir = os.path.abspath(out_dir)
+    return _cached((out_dir, 'compiled'), os.path.join(out_dir, 'meta.json'),
+                   lambda: CompiledForest.load(out_dir))
+
+
+def load_pair(model_path, encoder_path, mmap_mode=None):
+    """예측 모델과 인코더를 함께 로드 (각각 캐시됨)"""
+    return load(model_path, mmap_mode=mmap_mode), load(encoder_path)
+
+
+def file_version(path):
+    """파일 내용 해시(sha256 앞 16자리). 서명이 같으면 다시 계산하지 않습니다."""
+    path = os.path.abspath(path)
+    signature = _signature(path)
+    with _lock:
+        entry = _versions.get(path)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    version = digest.hexdigest()[:16]
+    with _lock:
+        _versions[path] = (signature, version)
+    return version
+
+
+def clear():
+    """캐시된 모델을 모두 비웁니다."""
+    with _lock:
+        _cache.clear()
+        _versions.clear()
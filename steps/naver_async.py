@@ -0,0 +1,206 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlparse
+
+import numpy as np
+import pandas as pd
+import requests
+
+from steps.naver_parse import NAVER_SEARCH_URL, needs_browser, parse_movie_page, search_url
+from steps.rate_limit import AdaptiveRateLimiter, RetryPolicy, is_failure
+
+# 동시에 진행하는 HTTP 요청 수
+DEFAULT_CONCURRENCY = 8
+# 요청 하나의 제한 시간 (초)
+DEFAULT_TIMEOUT = 10
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept-Language": "ko-KR,ko;q=0.9",
+}
+CRAWL_COLUMNS = ['네티즌 평점', '네이버 관심도(찜)', '누적 관객수']
+
+# 작업 스레드마다 HTTP 세션 하나 (연결 재사용)
+_local = threading.local()
+
+
+def _session():
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = _local.session = requests.Session()
+        session.headers.update(HEADERS)
+    return session
+
+
+def fetch_html(url, timeout=DEFAULT_TIMEOUT):
+    """검색 결과 HTML (상태 코드가 200이 아니면 예외)"""
+    response = _session().get(url, timeout=timeout)
+    response.raise_for_status()
+    response.encoding = response.encoding or 'utf-8'
+    return response.text
+
+
+async def _fetch_one(title, semaphore, base_url, timeout, cache, journal, limiter, retry):
+    """(결과 튜플 또는 None) — None이면 브라우저 렌더링이 필요한 페이지"""
+    attempt = 0
+    while True:
+        # 캐시에서 읽은 결과는 기간 안에서는 그대로 사용, 새로 받은 결과만 캐시를 건너뛰고 다시 시도 (DriverPool과 같은 규칙)
+        result, fresh = await _fetch_result(title, semaphore, base_url, timeout, cache, limiter,
+                                            use_cached=attempt == 0)
+        if result is None or not fresh or not retry.should_retry(result, attempt):
+            break
+        limiter.on_retry()
+        await asyncio.sleep(retry.delay(attempt))
+        attempt += 1
+    if result is not None and journal is not None:
+        journal.record(title, result)
+    return result
+
+
+async def _fetch_result(title, semaphore, base_url, timeout, cache, limiter, use_cached=True):
+    """(결과 튜플 또는 None, 새로 내려받았는지)"""
+    url = search_url(title, base_url)
+    html = cache.get(url) if cache is not None and use_cached else None
+    if html is not None:
+        return parse_movie_page(html), False
+    async with semaphore:
+        await limiter.acquire_async()
+        try:
+            html = await asyncio.to_thread(fetch_html, url, timeout)
+        except Exception as e:
+            limiter.on_failure()    # 시간 초과, 429/5xx 등 → 속도 줄이기
+            print(f"  [오류] '{title}' HTTP 요청 실패: {e}")
+            return ('Error', 'Error', 'Error'), True
+    if needs_browser(html):
+        limiter.on_failure()        # 차단/보안 확인 페이지도 여기에 해당 → 속도 줄이기
+        return None, True
+    if cache is not None:
+        cache.put(url, html)
+    result = parse_movie_page(html)
+    # 응답 내용 기준으로 속도 조절 (DriverPool과 같은 기준)
+    if is_failure(result):
+        limiter.on_failure()
+    else:
+        limiter.on_success()
+    return result, True
+
+
+async def crawl_titles_async(titles, concurrency=DEFAULT_CONCURRENCY, base_url=NAVER_SEARCH_URL,
+                             timeout=DEFAULT_TIMEOUT, cache=None, journal=None, limiter=None, retry=None):
+    """titles 순서대로 (평점, 관심도, 관객수) 또는 None(브라우저 필요) 목록"""
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = limiter or AdaptiveRateLimiter()
+    retry = retry or RetryPolicy()
+    return await asyncio.gather(*[_fetch_one(t, semaphore, base_url, timeout, cache, journal, limiter, retry)
+                                  for t in titles])
+
+
+def _selenium_fallback(titles, cache=None, journal=None, limiter=None, retry=None):
+    # selenium은 브라우저가 꼭 필요한 페이지가 있을 때만 import
+    from steps.step2_naverinfo import DriverPool
+    on_result = (lambda index, title, result: journal.record(title, result)) if journal is not None else None
+    results = DriverPool(cache=cache, on_result=on_result, limiter=limiter, retry=retry).crawl(enumerate(titles))
+    return [results[i] for i in range(len(titles))]
+
+
+def crawl_titles(titles, concurrency=DEFAULT_CONCURRENCY, base_url=NAVER_SEARCH_URL,
+                 timeout=DEFAULT_TIMEOUT, fallback=_selenium_fallback, cache=None, journal=None,
+                 limiter=None, retry=None):
+    """
+    제목 목록을 HTTP로 동시에 가져와 (평점, 관심도, 관객수) 목록을 반환합니다. (입력 순서 유지)
+    자바스크립트 렌더링이 필요한 페이지만 fallback(제목 목록, cache)으로 다시 처리합니다. (기본: Selenium)
+    fallback=None이면 그런 페이지는 'Error'로 남깁니다.
+    cache(PageCache)가 주어지면 기간 안에 받아 둔 페이지는 다시 내려받지 않습니다.
+    journal(CrawlJournal)이 주어지면 제목마다 결과를 기록합니다.
+    요청 속도는 limiter(AdaptiveRateLimiter)가, 'Error'/'N/A' 결과의 재시도는 retry(RetryPolicy)가 정합니다.
+    """
+    limiter = limiter or AdaptiveRateLimiter()
+    retry = retry or RetryPolicy()
+    results = asyncio.run(crawl_titles_async(list(titles), concurrency, base_url, timeout, cache, journal,
+                                             limiter, retry))
+    pending = [i for i, r in enumerate(results) if r is None]
+    if pending:
+        print(f"  브라우저가 필요한 페이지 {len(pending)}건은 Selenium으로 다시 가져옵니다.")
+        retried = (fallback([titles[i] for i in pending], cache=cache, journal=journal, limiter=limiter,
+                            retry=retry) if fallback
+                   else [('Error',) * 3] * len(pending))
+        for i, r in zip(pending, retried):
+            results[i] = r
+    return results
+
+
+def crawl_missing(df, concurrency=DEFAULT_CONCURRENCY, base_url=NAVER_SEARCH_URL,
+                  timeout=DEFAULT_TIMEOUT, fallback=_selenium_fallback, cache=None, journal=None,
+                  limiter=None, retry=None):
+    """
+    step2_naverinfo.crawl_missing과 같은 결과를 HTTP 동시 요청으로 만듭니다.
+    '네티즌 평점'이 없는 행만 크롤링하며, 원본 df는 수정하지 않습니다.
+    journal(CrawlJournal)이 주어지면 지난 실행에서 받아 둔 결과를 먼저 채우고 나머지만 크롤링합니다.
+    """
+    df = df.copy()
+    for col in CRAWL_COLUMNS:
+        if col not in df.columns: df[col] = np.nan
+        df[col] = df[col].astype(object)
+    if journal is not None:
+        df, resumed = journal.apply(df)
+        print(f"  크롤링 기록에서 {resumed}편을 이어받았습니다.")
+
+    missing = df.index[df[CRAWL_COLUMNS[0]].isna()]
+    print(f"\n🚀 HTTP 동시 크롤링을 시작합니다. ({len(missing)}/{len(df)}편, 동시 {concurrency}개)")
+    start = time.perf_counter()
+    limiter = limiter or AdaptiveRateLimiter()
+    results = crawl_titles(df.loc[missing, '영화명'].tolist(), concurrency, base_url, timeout, fallback,
+                           cache, journal, limiter, retry)
+    if journal is not None:
+        journal.flush()
+    for index, result in zip(missing, results):
+        for col, value in zip(CRAWL_COLUMNS, result):
+            df.at[index, col] = value
+    elapsed = time.perf_counter() - start
+    print(f"✅ {len(missing)}편 완료 ({elapsed:.1f}초, {len(missing) / max(elapsed, 1e-9):.1f}편/초) {limiter.stats()}")
+    return df
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    pages_dir = None
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query).get('query', [''])[0]
+        path = os.path.join(self.pages_dir, quote(query, safe='') + '.html')
+        if not os.path.exists(path):
+            self.send_response(404)
+            self.end_headers()
+            return
+        with open(path, 'rb') as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_saved_pages(pages_dir, port=0):
+    """
+    저장해 둔 검색 결과 페이지를 돌려주는 로컬 스텁 서버를 백그라운드 스레드로 띄웁니다.
+    pages_dir/<quote('<제목> 영화')>.html 파일을 ?query=<제목> 영화 요청에 응답합니다.
+    (서버, base_url)을 반환하며 server.shutdown()으로 종료합니다.
+    """
+    handler = type('StubHandler', (_StubHandler,), {'pages_dir': pages_dir})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/search.naver"
+
+
+if __name__ == "__main__":
+    # 사용법: python -m steps.naver_async <입력 CSV> <출력 CSV> [동시 요청 수]
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_CONCURRENCY
+    catalog = pd.read_csv(sys.argv[1])
+    crawl_missing(catalog, concurrency=concurrency).to_csv(sys.argv[2], index=False, encoding='utf-8-sig')
+    print(f"✨ 결과를 '{sys.argv[2]}'에 저장했습니다.")
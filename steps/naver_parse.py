@@ -0,0 +1,176 @@
+import importlib.util
+import json
+import os
+import re
+import sys
+import time
+from urllib.parse import quote
+
+import numpy as np
+from bs4 import BeautifulSoup
+
+from steps.normalize import parse_count
+
+# 네이버 통합 검색 주소 (테스트 시 로컬 스텁 서버 주소로 바꿔 사용)
+NAVER_SEARCH_URL = "https://search.naver.com/search.naver"
+# 검색 결과의 공통 모듈 / 영화 정보 섹션
+MODULE_SELECTOR = "div.sc_new.cs_common_module"
+MOVIE_SECTION_SELECTOR = "div.sc_new.cs_common_module._au_movie_content_wrap"
+MOVIE_SECTION_CLASSES = {'sc_new', 'cs_common_module', '_au_movie_content_wrap'}
+# lxml이 설치되어 있으면 더 빠른 lxml 파서 사용
+PARSER = 'lxml' if importlib.util.find_spec('lxml') else 'html.parser'
+# 저장해 둔 검색 결과 페이지 (파서 비교/벤치마크용)
+SAMPLE_PAGES_DIR = "./data/naver_samples"
+
+_DIV_OPEN = re.compile(r'<div\b[^>]*>', re.I)
+_CLASS_ATTR = re.compile(r'''\bclass\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))''', re.I)
+# 섹션 끝을 찾을 때 script/style/주석 안의 '</div>' 문자열은 건너뜀
+_SECTION_TAGS = re.compile(r'(?P<skip><script\b.*?</script\s*>|<style\b.*?</style\s*>|<!--.*?-->)'
+                           r'|<(?P<close>/?)div\b[^>]*>', re.I | re.S)
+
+
+def search_url(movie_title, base_url=NAVER_SEARCH_URL):
+    """'<제목> 영화' 검색 결과 페이지 주소"""
+    return f"{base_url}?query={quote(movie_title + ' 영화')}"
+
+
+def parse_audience_count(text):
+    """'만', '억' 등의 문자를 숫자 문자열로 변환하는 함수 (규칙은 normalize.parse_count)"""
+    if not isinstance(text, str): return 'N/A'
+    num = parse_count(text)
+    return 'N/A' if np.isnan(num) else str(int(num))
+
+
+def needs_browser(html):
+    """
+    검색 결과 공통 모듈이 HTML에 아예 없으면 자바스크립트 렌더링이 필요한 페이지로 보고 True.
+    (Selenium 경로에서 WebDriverWait로 기다리던 요소와 같은 기준)
+    """
+    return 'cs_common_module' not in html
+
+
+def _inside_raw_text(html, pos):
+    """pos가 <script>/<style> 내용 안이면 True"""
+    for tag in ('script', 'style'):
+        if html.rfind('<' + tag, 0, pos) > html.rfind('</' + tag, 0, pos):
+            return True
+    return False
+
+
+def find_movie_section(html):
+    """
+    전체 HTML을 파싱하지 않고 영화 정보 섹션(div)만 잘라낸 HTML 조각을 반환합니다. (없으면 None)
+    MOVIE_SECTION_SELECTOR처럼 문서 순서상 첫 번째 섹션을 고르고, div 태그 짝을 세어 끝을 찾습니다.
+    """
+    start = html.find('_au_movie_content_wrap')
+    while start != -1:
+        open_at = html.rfind('<div', 0, start)
+        tag = _DIV_OPEN.match(html, open_at) if open_at != -1 else None
+        if tag and tag.end() > start and not _inside_raw_text(html, open_at):
+            classes = _CLASS_ATTR.search(tag.group(0))
+            if classes and MOVIE_SECTION_CLASSES <= set(next(c for c in classes.groups() if c is not None).split()):
+                depth = 0
+                for m in _SECTION_TAGS.finditer(html, open_at):
+                    if m.group('skip'):
+                        continue
+                    depth += -1 if m.group('close') else 1
+                    if depth == 0:
+                        return html[open_at:m.end()]
+                return html[open_at:]       # 닫히지 않은 섹션은 문서 끝까지 (html.parser와 같은 처리)
+        start = html.find('_au_movie_content_wrap', start + 1)
+    return None
+
+
+def parse_movie_page(html, targeted=True):
+    """
+    검색 결과 HTML에서 (평점, 관심도, 관객수)를 추출합니다.
+    영화 정보 섹션이 없으면 ('Not Found', 'Not Found', 'Not Found'), 각 항목이 없으면 'N/A'입니다.
+    targeted=True이면 영화 정보 섹션 조각만 PARSER로 파싱하고, False이면 전체 페이지를 html.parser로 파싱합니다.
+    """
+    if targeted:
+        fragment = find_movie_section(html)
+        movie_section = BeautifulSoup(fragment, PARSER).select_one(MOVIE_SECTION_SELECTOR) if fragment else None
+    else:
+        movie_section = BeautifulSoup(html, 'html.parser').select_one(MOVIE_SECTION_SELECTOR)
+    if not movie_section:
+        return 'Not Found', 'Not Found', 'Not Found'
+    return _extract_fields(movie_section)
+
+
+def _extract_fields(movie_section):
+    rating, interest, audience_count = 'N/A', 'N/A', 'N/A'
+
+    # 각 정보 추출 시, 요소가 없는 경우를 대비해 try-except로 안전하게 처리
+    try:
+        # 실관람객 평점 우선
+        rating_element = movie_section.select_one("a.lego_rating_box_see .area_star_number")
+        if rating_element:
+            rating = re.search(r'(\d+\.?\d*)', rating_element.get_text(strip=True)).group(1)
+        else: # 없으면 네티즌 평점
+            rating_dt = movie_section.find('dt', string='평점')
+            if rating_dt and rating_dt.find_next_sibling('dd'):
+                rating = rating_dt.find_next_sibling('dd').get_text(strip=True)
+    except Exception:
+        pass # 평점 정보가 없으면 'N/A' 유지
+
+    try:
+        interest_element = movie_section.select_one("span._like_count")
+        if interest_element:
+            interest = interest_element.get_text(strip=True).replace(',', '')
+    except Exception:
+        pass # 관심도 정보가 없으면 'N/A' 유지
+
+    try:
+        audience_dt = movie_section.find('dt', string='관객수')
+        if audience_dt and audience_dt.find_next_sibling('dd'):
+            audience_text = audience_dt.find_next_sibling('dd').get_text(strip=True)
+            audience_count = parse_audience_count(audience_text)
+    except Exception:
+        pass # 관객수 정보가 없으면 'N/A' 유지
+
+    return rating, interest, audience_count
+
+
+def load_sample_pages(pages_dir=SAMPLE_PAGES_DIR):
+    """[(파일 이름, HTML, 기대 결과 또는 None)] — 기대 결과는 pages_dir/expected.json"""
+    expected_path = os.path.join(pages_dir, 'expected.json')
+    expected = {}
+    if os.path.exists(expected_path):
+        with open(expected_path, encoding='utf-8') as f:
+            expected = json.load(f)
+    pages = []
+    for name in sorted(os.listdir(pages_dir)):
+        if name.endswith('.html'):
+            with open(os.path.join(pages_dir, name), encoding='utf-8') as f:
+                result = expected.get(name)
+                pages.append((name, f.read(), tuple(result) if result else None))
+    return pages
+
+
+def benchmark(pages_dir=SAMPLE_PAGES_DIR, repeat=20):
+    """
+    저장된 페이지에서 추출만 반복해 초당 페이지 수를 비교합니다. (네트워크/브라우저 제외)
+    전체 파싱과 섹션 파싱 결과가 다르거나 기대 결과와 다르면 AssertionError.
+    """
+    pages = load_sample_pages(pages_dir)
+    for name, html, expected in pages:
+        full, targeted = parse_movie_page(html, targeted=False), parse_movie_page(html)
+        assert full == targeted, f"{name}: 전체 {full} != 섹션 {targeted}"
+        assert expected is None or targeted == expected, f"{name}: {targeted} != 기대 {expected}"
+    rows = []
+    for label, targeted in [('전체 페이지 (html.parser)', False), (f'섹션만 ({PARSER})', True)]:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for _, html, _ in pages:
+                parse_movie_page(html, targeted=targeted)
+        elapsed = time.perf_counter() - start
+        rows.append((label, len(pages) * repeat / elapsed))
+    return rows
+
+
+if __name__ == "__main__":
+    # 사용법: python -m steps.naver_parse [저장된 페이지 폴더] [반복 횟수]
+    pages_dir = sys.argv[1] if len(sys.argv) > 1 else SAMPLE_PAGES_DIR
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    for label, pages_per_second in benchmark(pages_dir, repeat):
+        print(f"{label}: {pages_per_second:,.1f} 페이지/초")
@@ -0,0 +1,78 @@
+import math
+import re
+
+import numpy as np
+import pandas as pd
+
+# '1억 2,345만명', '12.3만', '53,120명' 같은 개수 문자열 컬럼
+COUNT_COLUMNS = ['누적 관객수', '네이버 관심도(찜)', '매력도', '예측 매력도']
+# 그냥 숫자인 컬럼 ('N/A', 'Error' 등은 NaN)
+NUMBER_COLUMNS = ['실관람객 평점', '네티즌 평점']
+
+_EOK = r'(\d+\.?\d*)억'
+_MAN = r'(\d+\.?\d*)만'
+_PLAIN = r'(\d+)'
+# 단위/숫자/'명'만으로 이루어진 문자열 (쉼표 제거 후)
+_COUNT_TEXT = re.compile(r'\s*(?:\d+\.?\d*\s*억)?\s*(?:\d+\.?\d*\s*만)?\s*\d*\.?\d*\s*명?\s*')
+
+
+def parse_count(value):
+    """
+    개수 값 하나를 숫자(float)로 변환합니다. (변환할 수 없으면 NaN)
+    '억', '만' 단위를 더하고, 단위가 없으면 처음 나오는 정수를 사용합니다. parse_counts와 같은 규칙입니다.
+    """
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return np.nan
+    if isinstance(value, (int, float, np.number)):
+        return float(value)
+    text = str(value).replace(',', '')
+    num = 0.0
+    for pattern, unit in ((_EOK, 1e8), (_MAN, 1e4)):
+        m = re.search(pattern, text)
+        if m:
+            num += float(m.group(1)) * unit
+    if num > 0:
+        return float(round(num))
+    m = re.search(_PLAIN, text)
+    return float(m.group(1)) if m else np.nan
+
+
+def parse_counts(values):
+    """
+    개수 컬럼 전체를 한 번에 float64 Series로 변환합니다. (행마다 파이썬 함수를 호출하지 않음)
+    이미 숫자형이면 그대로 float64로 바꿉니다.
+    """
+    s = values if isinstance(values, pd.Series) else pd.Series(values)
+    if pd.api.types.is_numeric_dtype(s.dtype):
+        return s.astype('float64')
+    text = s.astype('string').str.replace(',', '', regex=False)
+    units = (pd.to_numeric(text.str.extract(_EOK, expand=False), errors='coerce').fillna(0) * 1e8
+             + pd.to_numeric(text.str.extract(_MAN, expand=False), errors='coerce').fillna(0) * 1e4)
+    plain = pd.to_numeric(text.str.extract(_PLAIN, expand=False), errors='coerce')
+    return units.round().where(units > 0, plain).astype('float64')
+
+
+def parse_numbers(values):
+    """평점처럼 단위 없는 숫자 컬럼을 float64로 변환 (숫자가 아니면 NaN)"""
+    s = values if isinstance(values, pd.Series) else pd.Series(values)
+    return pd.to_numeric(s, errors='coerce').astype('float64')
+
+
+def is_count_text(text):
+    """'12.3만', '1억 2만명'처럼 개수만 나타내는 문자열이면 True ('5만 미만' 같은 구간 이름은 False)"""
+    return bool(text.strip()) and _COUNT_TEXT.fullmatch(text.replace(',', '')) is not None
+
+
+def normalize_catalog(df):
+    """
+    카탈로그의 개수/평점 컬럼을 숫자형으로 바꾼 사본을 반환합니다.
+    불러올 때 한 번만 호출하고, 이후 단계와 화면에서는 변환된 컬럼을 그대로 사용합니다.
+    """
+    df = df.copy()
+    for col in COUNT_COLUMNS:
+        if col in df.columns:
+            df[col] = parse_counts(df[col])
+    for col in NUMBER_COLUMNS:
+        if col in df.columns:
+            df[col] = parse_numbers(df[col])
+    return df
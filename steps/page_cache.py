@@ -0,0 +1,155 @@
+import gzip
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+import pandas as pd
+
+from steps.naver_parse import NAVER_SEARCH_URL, parse_movie_page, search_url
+
+DEFAULT_CACHE_DIR = "./data/page_cache"
+# 이 시간이 지난 페이지는 다시 내려받음 (초)
+DEFAULT_TTL = 7 * 24 * 3600
+# 저장된 HTML(압축 후) 총 크기 상한. 넘으면 가장 오래 쓰이지 않은 페이지부터 삭제
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+CRAWL_COLUMNS = ['네티즌 평점', '네이버 관심도(찜)', '누적 관객수']
+
+
+class PageCache:
+    """
+    검색 결과 HTML 캐시.
+    - 본문: 내용 해시(sha256) 이름의 gzip 파일 (objects/ab/abcd....html.gz), 같은 내용은 한 번만 저장
+    - 색인: sqlite (주소 → 해시, 가져온 시각, 마지막 사용 시각, 크기)
+    여러 크롤링 스레드에서 함께 사용할 수 있습니다.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(os.path.join(cache_dir, 'objects'), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(cache_dir, 'index.sqlite'), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " url TEXT PRIMARY KEY, digest TEXT NOT NULL, fetched_at REAL NOT NULL,"
+            " last_access REAL NOT NULL, size INTEGER NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS pages_lru ON pages(last_access)")
+        self._db.commit()
+        # 저장된 총 크기 (열 때 한 번만 합산하고 이후 put/evict에서 갱신)
+        self._total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+
+    def _path(self, digest):
+        return os.path.join(self.cache_dir, 'objects', digest[:2], digest + '.html.gz')
+
+    def get(self, url, ttl=None):
+        """캐시된 HTML (없거나 ttl(기본: self.ttl)보다 오래됐으면 None). ttl=float('inf')이면 기간 무시"""
+        ttl = self.ttl if ttl is None else ttl
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT digest, fetched_at FROM pages WHERE url = ?", (url,)).fetchone()
+            if row is None or now - row[1] > ttl:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE pages SET last_access = ? WHERE url = ?", (now, url))
+            self._db.commit()
+        try:
+            with gzip.open(self._path(row[0]), 'rb') as f:
+                html = f.read().decode('utf-8')
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return html
+
+    def put(self, url, html):
+        """HTML을 저장하고 내용 해시를 반환합니다."""
+        data = html.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f'{path}.{threading.get_ident()}.tmp'
+            with gzip.open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        now = time.time()
+        size = os.path.getsize(path)
+        with self._lock:
+            old = self._db.execute("SELECT size FROM pages WHERE url = ?", (url,)).fetchone()
+            self._db.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)",
+                             (url, digest, now, now, size))
+            self._db.commit()
+            self._total += size - (old[0] if old else 0)
+            over = self._total > self.max_bytes
+        if over:
+            self.evict()
+        return digest
+
+    def evict(self):
+        """총 크기가 max_bytes 이하가 될 때까지 마지막 사용 시각이 오래된 항목부터 삭제"""
+        with self._lock:
+            total = self._total
+            if total <= self.max_bytes:
+                return 0
+            removed = 0
+            for url, digest, size in self._db.execute(
+                    "SELECT url, digest, size FROM pages ORDER BY last_access").fetchall():
+                if total <= self.max_bytes:
+                    break
+                self._db.execute("DELETE FROM pages WHERE url = ?", (url,))
+                total -= size
+                removed += 1
+                # 같은 내용을 가리키는 다른 주소가 없을 때만 파일 삭제
+                if self._db.execute("SELECT 1 FROM pages WHERE digest = ? LIMIT 1", (digest,)).fetchone() is None:
+                    try:
+                        os.remove(self._path(digest))
+                    except OSError:
+                        pass
+            self._db.commit()
+            self._total = total
+            return removed
+
+    def stats(self):
+        with self._lock:
+            count = self._db.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+            total = self._total
+        return {'pages': count, 'bytes': total, 'hits': self.hits, 'misses': self.misses}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def reparse_cached(df, cache, base_url=NAVER_SEARCH_URL):
+    """
+    오프라인 재추출: 네트워크 없이 캐시된 검색 결과 페이지만 다시 파싱하여 크롤링 컬럼을 덮어씁니다.
+    (추출 규칙을 고친 뒤 전체를 다시 크롤링하지 않고 결과를 갱신할 때 사용, 캐시 기간은 무시)
+    캐시에 없는 영화는 기존 값을 그대로 둡니다. (DataFrame, 재추출한 행 수)를 반환합니다.
+    """
+    df = df.copy()
+    for col in CRAWL_COLUMNS:
+        if col not in df.columns: df[col] = float('nan')
+        df[col] = df[col].astype(object)
+    parsed = 0
+    for index, title in df['영화명'].items():
+        html = cache.get(search_url(title, base_url), ttl=float('inf'))
+        if html is None:
+            continue
+        for col, value in zip(CRAWL_COLUMNS, parse_movie_page(html)):
+            df.at[index, col] = value
+        parsed += 1
+    return df, parsed
+
+
+if __name__ == "__main__":
+    # 사용법: python -m steps.page_cache <입력 CSV> <출력 CSV> [캐시 폴더]   (오프라인 재추출)
+    cache = PageCache(sys.argv[3] if len(sys.argv) > 3 else DEFAULT_CACHE_DIR)
+    catalog, parsed = reparse_cached(pd.read_csv(sys.argv[1]), cache)
+    catalog.to_csv(sys.argv[2], index=False, encoding='utf-8-sig')
+    print(f"✨ 캐시된 페이지 {parsed:,}건을 다시 추출하여 '{sys.argv[2]}'에 저장했습니다. {cache.stats()}")
@@ -0,0 +1,50 @@
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# 작업 프로세스마다 한 번만 열어 두는 공유 배열 (메모리 맵, 읽기 전용)
+_SHARED = None
+
+
+def resolve_n_jobs(n_jobs):
+    """n_jobs=-1 또는 None이면 CPU 코어 수, 그 외에는 1 이상 값"""
+    if n_jobs is None or n_jobs < 0:
+        return os.cpu_count() or 1
+    return max(1, n_jobs)
+
+
+def _init_worker(paths):
+    global _SHARED
+    _SHARED = {name: np.load(path, mmap_mode='r') for name, path in paths.items()}
+
+
+def _run_shard(func, kwargs, rows):
+    return func(_SHARED, rows, **kwargs)
+
+
+def run_sharded(func, rows, arrays, n_jobs, shards_per_job=4, **kwargs):
+    """
+    rows를 연속 구간(shard)으로 나누어 프로세스 풀에서 func(shared, shard_rows, **kwargs)를 실행합니다.
+    arrays(dict)는 임시 폴더에 .npy로 한 번 저장한 뒤 각 작업 프로세스가 메모리 맵으로 열기 때문에,
+    큰 읽기 전용 배열을 작업마다 pickle로 복사하지 않습니다.
+    func는 모듈 최상위 함수여야 하며 shard별 결과 리스트를 반환해야 합니다.
+    결과는 rows 순서대로 이어 붙이므로 직렬 실행과 같습니다.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    n_jobs = min(resolve_n_jobs(n_jobs), max(1, len(rows)))
+    shards = [s for s in np.array_split(rows, n_jobs * shards_per_job) if len(s)]
+
+    with tempfile.TemporaryDirectory(prefix='skreen_shared_') as tmp_dir:
+        paths = {}
+        for name, array in arrays.items():
+            paths[name] = os.path.join(tmp_dir, f'{name}.npy')
+            np.save(paths[name], np.ascontiguousarray(array))
+
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(paths,)) as executor:
+            futures = [executor.submit(_run_shard, func, kwargs, shard) for shard in shards]
+            results = []
+            for future in futures:
+                results.extend(future.result())
+    return results
@@ -0,0 +1,114 @@
+import hashlib
+import os
+import pickle
+import time
+
+import pandas as pd
+
+from steps.catalog_store import csv_roundtrip, load_catalog, save_catalog
+
+# 단계별 체크포인트(출력 컬럼 pickle) 저장 위치
+DEFAULT_CHECKPOINT_DIR = "./data/pipeline_cache"
+
+
+class Stage:
+    """
+    파이프라인 단계 하나.
+    func(df)는 outputs 컬럼 이름 -> 값(행 수와 같은 길이)의 dict를 반환합니다.
+    inputs 컬럼 값과 version()이 지난 실행과 같으면 func를 건너뛰고 체크포인트를 사용합니다.
+    """
+
+    def __init__(self, name, func, inputs, outputs, version=None, enabled=True):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.version = version
+        self.enabled = enabled
+
+
+def input_fingerprint(df, columns, version=''):
+    """df의 columns 값(행 순서 포함)과 version 문자열의 해시"""
+    digest = hashlib.sha256()
+    digest.update(str(version).encode('utf-8'))
+    for col in columns:
+        digest.update(col.encode('utf-8') + b'\x1f')
+        if col in df.columns:
+            digest.update(pd.util.hash_pandas_object(df[col], index=False).to_numpy().tobytes())
+    digest.update(str(len(df)).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _load_checkpoint(path, fingerprint):
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            checkpoint = pickle.load(f)
+    except Exception:
+        return None
+    return checkpoint['outputs'] if checkpoint.get('fingerprint') == fingerprint else None
+
+
+def _save_checkpoint(path, fingerprint, outputs):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump({'fingerprint': fingerprint, 'outputs': outputs}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def write_csv_atomic(df, path):
+    """임시 파일에 쓴 뒤 교체하여, 중간에 실패해도 기존 파일이 반쯤 쓰인 상태로 남지 않게 합니다."""
+    tmp_path = path + '.tmp'
+    try:
+        df.to_csv(tmp_path, index=False, encoding='utf-8-sig')
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def run_pipeline(stages, input_path, output_path=None, checkpoint_dir=DEFAULT_CHECKPOINT_DIR,
+                 force=(), on_stage=None, store_dir=None):
+    """
+    CSV를 한 번 읽어 stages를 순서대로 메모리에서 실행하고, 결과를 output_path(기본: input_path)에 한 번만 씁니다.
+    store_dir가 주어지면 CSV 대신 컬럼 저장소(steps/catalog_store.py)에서 읽고, CSV를 쓴 뒤 저장소도 갱신합니다.
+    force에 들어 있는 단계는 입력이 같아도 다시 실행합니다.
+    on_stage(이름, 상태, 소요 초)가 주어지면 단계 시작('running')과 끝('done'/'skipped'/'disabled')마다 호출합니다.
+    (DataFrame, 단계별 소요 시간 표) 를 반환합니다.
+    """
+    output_path = output_path or input_path
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    df = load_catalog(input_path, store_dir) if store_dir else pd.read_csv(input_path)
+
+    report = []
+    for stage in stages:
+        start = time.perf_counter()
+        if not stage.enabled:
+            status = 'disabled'
+        else:
+            if on_stage:
+                on_stage(stage.name, 'running', 0.0)
+            version = stage.version() if stage.version else ''
+            fingerprint = input_fingerprint(df, stage.inputs, version)
+            path = os.path.join(checkpoint_dir, f'{stage.name}.pkl')
+            outputs = None if stage.name in force else _load_checkpoint(path, fingerprint)
+            status = 'skipped'
+            if outputs is None:
+                outputs = stage.func(df)
+                _save_checkpoint(path, fingerprint, outputs)
+                status = 'done'
+            for col in stage.outputs:
+                df[col] = outputs[col]
+        elapsed = time.perf_counter() - start
+        report.append({'stage': stage.name, 'status': status, 'seconds': round(elapsed, 3)})
+        if on_stage:
+            on_stage(stage.name, status, elapsed)
+
+    write_csv_atomic(df, output_path)
+    if store_dir:
+        written = [col for stage in stages if stage.enabled for col in stage.outputs]
+        save_catalog(csv_roundtrip(df, written), store_dir, output_path)
+    report = pd.DataFrame(report)
+    print(report.to_string(index=False))
+    return df, report
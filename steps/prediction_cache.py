@@ -0,0 +1,90 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from steps import model_registry
+
+# 캐시에 남겨 둘 최대 항목 수 (넘으면 가장 오래 쓰이지 않은 지문부터 삭제)
+DEFAULT_MAX_ENTRIES = 2_000_000
+
+
+def model_version(model_path, encoder_path):
+    """모델/인코더 파일 내용 기준 버전 문자열 (둘 중 하나라도 바뀌면 캐시 무효화)"""
+    return model_registry.file_version(model_path) + model_registry.file_version(encoder_path)
+
+
+def feature_fingerprints(x):
+    """모델 입력 특성 행마다 64비트 지문 (값이 하나라도 다르면 다른 지문)"""
+    return pd.util.hash_pandas_object(x, index=False).to_numpy(dtype=np.uint64)
+
+
+class PredictionCache:
+    """
+    (모델 버전, 특성 지문) -> 예측 매력도 캐시.
+    지문은 정렬된 배열로 보관하여 이진 탐색으로 조회하고, npz 파일 하나에 저장합니다.
+    저장된 모델 버전이 다르면 빈 캐시로 시작합니다.
+    """
+
+    def __init__(self, path, version, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.version = version
+        self.max_entries = max_entries
+        self.fingerprints = np.empty(0, dtype=np.uint64)
+        self.values = np.empty(0)
+        self.stamps = np.empty(0, dtype=np.int64)   # 마지막으로 쓰인 실행 번호
+        self.run = 0
+        self.hits = 0
+        self.lookups = 0
+        if os.path.exists(path):
+            data = np.load(path)
+            if str(data['version']) == version:
+                self.fingerprints, self.values, self.stamps = data['fingerprints'], data['values'], data['stamps']
+                self.run = int(data['run']) + 1
+
+    def lookup(self, fingerprints):
+        """(예측값 배열, 적중 여부 배열). 적중하지 않은 위치의 값은 NaN"""
+        idx = np.searchsorted(self.fingerprints, fingerprints)
+        idx_clipped = np.minimum(idx, max(len(self.fingerprints) - 1, 0))
+        hit = (idx < len(self.fingerprints)) & (self.fingerprints[idx_clipped] == fingerprints) \
+            if len(self.fingerprints) else np.zeros(len(fingerprints), dtype=bool)
+        values = np.full(len(fingerprints), np.nan)
+        values[hit] = self.values[idx[hit]]
+        self.stamps[idx[hit]] = self.run
+        self.hits += int(hit.sum())
+        self.lookups += len(fingerprints)
+        return values, hit
+
+    def add(self, fingerprints, values):
+        fingerprints, first = np.unique(fingerprints, return_index=True)
+        fresh = ~np.isin(fingerprints, self.fingerprints)
+        fps = np.concatenate([self.fingerprints, fingerprints[fresh]])
+        order = np.argsort(fps, kind='stable')
+        self.fingerprints = fps[order]
+        self.values = np.concatenate([self.values, np.asarray(values)[first][fresh]])[order]
+        self.stamps = np.concatenate([self.stamps, np.full(int(fresh.sum()), self.run)])[order]
+
+    def hit_rate(self):
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def save(self):
+        """최대 항목 수를 넘으면 오래된 항목을 지우고 임시 파일에 쓴 뒤 교체"""
+        if len(self.fingerprints) > self.max_entries:
+            keep = np.sort(np.argsort(-self.stamps, kind='stable')[:self.max_entries])
+            self.fingerprints, self.values, self.stamps = self.fingerprints[keep], self.values[keep], self.stamps[keep]
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, version=self.version, run=self.run, fingerprints=self.fingerprints,
+                     values=self.values, stamps=self.stamps)
+        os.replace(tmp_path, self.path)
+
+    def predict(self, x, predict):
+        """
+        캐시에 없는 행만 predict(특성 DataFrame)로 계산하고 나머지는 캐시 값을 재사용합니다.
+        """
+        fingerprints = feature_fingerprints(x)
+        values, hit = self.lookup(fingerprints)
+        if (~hit).any():
+            values[~hit] = predict(x[~hit])
+            self.add(fingerprints[~hit], values[~hit])
+        return values
@@ -0,0 +1,116 @@
+import asyncio
+import random
+import threading
+import time
+
+# 기본 초당 요청 수 (기존 0.5초 고정 대기와 같은 속도에서 시작)
+DEFAULT_RATE = 2.0
+DEFAULT_MIN_RATE = 0.2
+DEFAULT_MAX_RATE = 10.0
+# 다시 시도하는 결과 값
+RETRY_VALUES = ('Error', 'N/A')
+
+
+class AdaptiveRateLimiter:
+    """
+    토큰 버킷 + AIMD(성공 시 조금씩 올리고, 실패 시 절반으로 줄이는) 속도 제한기.
+    - acquire() / acquire_async(): 요청 하나를 보내기 전에 호출 (토큰이 생길 때까지 대기)
+    - on_success() / on_failure(): 요청 결과를 알려 속도를 조절 (시간 초과, 오류 페이지 등은 실패)
+    스레드와 asyncio 양쪽에서 함께 사용할 수 있으며, stats()로 처리량/오류율을 확인합니다.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, min_rate=DEFAULT_MIN_RATE, max_rate=DEFAULT_MAX_RATE,
+                 increase=0.1, decrease=0.5, burst=1.0):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.burst = burst
+        self._tokens = burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.requests = 0
+        self.successes = 0
+        self.failures = 0
+        self.retries = 0
+
+    def _reserve(self):
+        """토큰이 있으면 꺼내고 0, 없으면 기다려야 하는 초를 반환"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                self.requests += 1
+                return 0.0
+            return (1.0 - self._tokens) / self.rate
+
+    def acquire(self):
+        while True:
+            wait = self._reserve()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        while True:
+            wait = self._reserve()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def on_success(self):
+        with self._lock:
+            self.successes += 1
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+
+    def on_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def stats(self):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        done = self.successes + self.failures
+        return {
+            'requests': self.requests,
+            'successes': self.successes,
+            'failures': self.failures,
+            'retries': self.retries,
+            'rate': round(self.rate, 3),
+            'throughput': round(self.requests / elapsed, 3),
+            'error_rate': round(self.failures / done, 4) if done else 0.0,
+        }
+
+
+class RetryPolicy:
+    """
+    'Error' / 'N/A'가 들어 있는 결과를 최대 max_attempts번까지 다시 시도하는 규칙.
+    n번째 재시도 전 대기 시간은 base_delay * 2**n (최대 max_delay)에 0.5~1배 무작위 값을 곱한 것입니다.
+    새로 내려받은 결과만 다시 시도하며, 캐시(PageCache)에서 읽은 결과는 기간 안에서는 그대로 사용합니다.
+    """
+
+    def __init__(self, max_attempts=3, base_delay=1.0, max_delay=60.0, retry_values=RETRY_VALUES):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_values = set(retry_values)
+
+    def should_retry(self, result, attempt):
+        """attempt: 방금 끝난 시도 번호 (0부터)"""
+        return attempt + 1 < self.max_attempts and bool(self.retry_values.intersection(result))
+
+    def delay(self, attempt):
+        return min(self.max_delay, self.base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+
+def is_failure(result):
+    """속도를 줄여야 하는 결과 (요청 실패/시간 초과/오류 페이지)"""
+    return 'Error' in result
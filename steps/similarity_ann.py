@@ -0,0 +1,173 @@
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+# MinHash 해시 함수 (a * x + b) mod p 에 쓰는 메르센 소수
+_PRIME = np.uint64((1 << 31) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+# 정확도/속도 조절용 기본값: 밴드 수가 많을수록, 밴드당 행 수가 적을수록 재현율↑ 속도↓
+DEFAULT_LSH_OPTIONS = {
+    'bands': 16,          # LSH 밴드 수
+    'rows_per_band': 2,   # 밴드 하나를 이루는 MinHash 개수
+    'max_bucket': 16,     # 같은 버킷 안에서 비교할 최대 이웃 거리 (큰 버킷의 후보 수 제한)
+    'seed': 0,
+}
+
+
+def minhash_signatures(matrix, num_perm, seed=0):
+    """
+    TF-IDF 행렬의 행별 토큰 집합(0이 아닌 열)으로 MinHash 서명을 만듭니다.
+    토큰이 없는 행은 모든 값이 _MAX_HASH 입니다.
+    """
+    matrix = matrix.tocsr()
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, int(_PRIME), num_perm).astype(np.uint64)
+    b = rng.integers(0, int(_PRIME), num_perm).astype(np.uint64)
+
+    cols = matrix.indices.astype(np.uint64)
+    nonempty = np.diff(matrix.indptr) > 0
+    starts = matrix.indptr[:-1][nonempty]
+
+    sig = np.full((matrix.shape[0], num_perm), _MAX_HASH, dtype=np.uint64)
+    if len(cols) == 0:
+        return sig
+    for p in range(num_perm):
+        hashed = (a[p] * cols + b[p]) % _PRIME
+        sig[nonempty, p] = np.minimum.reduceat(hashed, starts)
+    return sig
+
+
+def candidate_pairs(sig, bands, rows_per_band, max_bucket, seed=0):
+    """
+    LSH 밴드별로 같은 버킷에 들어간 행 쌍 (i, j), i != j 를 양방향으로 반환합니다.
+    버킷은 정렬된 키 기준으로 max_bucket - 1 거리 안의 행끼리만 비교하여 후보 수를 제한합니다.
+    """
+    n = sig.shape[0]
+    active = np.flatnonzero(sig[:, 0] != _MAX_HASH)
+    rng = np.random.default_rng(seed + 1)
+    pairs = []
+    for band in range(bands):
+        block = sig[active, band * rows_per_band:(band + 1) * rows_per_band]
+        coef = rng.integers(1, 1 << 62, rows_per_band).astype(np.uint64)
+        keys = (block * coef).sum(axis=1, dtype=np.uint64)    # 오버플로는 2^64 모듈러 해시로 사용
+        order = np.argsort(keys, kind='stable')
+        keys, rows = keys[order], active[order]
+        for d in range(1, max_bucket):
+            same = keys[d:] == keys[:-d]
+            if not same.any():
+                break
+            a, b = rows[:-d][same], rows[d:][same]
+            pairs.append(np.minimum(a, b) * n + np.maximum(a, b))
+    if not pairs:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    codes = np.concatenate(pairs)
+    codes.sort()
+    codes = codes[np.r_[True, codes[1:] != codes[:-1]]]
+    i, j = codes // n, codes % n
+    return np.concatenate([i, j]), np.concatenate([j, i])
+
+
+def _pair_sims(matrix, i, j, chunk=1_000_000):
+    """후보 쌍의 코사인 유사도 (정규화된 행렬의 행 내적)"""
+    sims = np.empty(len(i))
+    for start in range(0, len(i), chunk):
+        stop = start + chunk
+        prod = matrix[i[start:stop]].multiply(matrix[j[start:stop]])
+        sims[start:stop] = np.asarray(prod.sum(axis=1)).ravel()
+    return sims
+
+
+def lsh_neighbors(matrix, tb_rank, top_k=5, bands=16, rows_per_band=2, max_bucket=16, seed=0):
+    """
+    MinHash LSH로 후보를 좁힌 뒤 후보끼리만 정확한 코사인 유사도를 계산하는 근사 top-k.
+    정렬/동점 처리와 반환 형식은 step3_recommend.topk_neighbors와 같습니다.
+    """
+    matrix = normalize(matrix.tocsr())
+    n = matrix.shape[0]
+    k = min(top_k, n - 1)
+    if k <= 0:
+        return [np.empty(0, dtype=np.int64) for _ in range(n)]
+
+    sig = minhash_signatures(matrix, bands * rows_per_band, seed=seed)
+    i, j = candidate_pairs(sig, bands, rows_per_band, max_bucket, seed=seed)
+    sims = _pair_sims(matrix, i, j)
+    keep = sims > 0
+    i, j, sims = i[keep], j[keep], sims[keep]
+
+    # 행별로 (유사도 내림차순, 동점 순위 오름차순) 정렬 후 앞에서 k개
+    order = np.lexsort((tb_rank[j], -sims, i))
+    i, j = i[order], j[order]
+    starts = np.searchsorted(i, np.arange(n + 1))
+    take = np.arange(len(i)) - starts[i] < k
+    i, j = i[take], j[take]
+    starts = np.searchsorted(i, np.arange(n + 1))
+
+    tb_order = np.argsort(tb_rank, kind='stable')
+    results = []
+    for r in range(n):
+        top = j[starts[r]:starts[r + 1]]
+        if len(top) < k:
+            # 후보가 부족하면 정확한 엔진과 같이 동점 순위 순서로 유사도 0 후보를 채움
+            head = tb_order[:k + len(top) + 1]
+            head = head[~np.isin(head, top) & (head != r)]
+            top = np.concatenate([top, head[:k - len(top)]])
+        results.append(top)
+    return results
+
+
+def recall_at_k(exact, exact_sims, approx):
+    """정확한 top-k 중 유사도가 0보다 큰 이웃을 근사 결과가 얼마나 찾았는지 (행 평균 recall@k)"""
+    hits, total = 0, 0
+    for e, s, a in zip(exact, exact_sims, approx):
+        relevant = e[s > 0]
+        hits += np.isin(relevant, a).sum()
+        total += len(relevant)
+    return hits / total if total else 1.0
+
+
+def recall_report(df, top_k=5, tiebreak_col='매력도', settings=None):
+    """
+    같은 데이터에서 정확한 엔진과 LSH 근사 엔진을 비교한 recall@k / 소요 시간 표를 반환합니다.
+    settings: LSH 옵션 dict 목록 (없으면 밴드 구성을 바꿔 가며 비교)
+    """
+    from steps.step3_recommend import keyword_sentences, tiebreak_rank, topk_neighbors
+
+    sentences = keyword_sentences(df)
+    matrix = TfidfVectorizer(ngram_range=(1, 2)).fit_transform(sentences)
+    positions = df.index.get_indexer(sentences.index)
+    if tiebreak_col in df.columns:
+        viewers = pd.to_numeric(df.loc[sentences.index, tiebreak_col], errors='coerce').fillna(-np.inf).to_numpy()
+    else:
+        viewers = np.full(len(sentences), -np.inf)
+    tb_rank = tiebreak_rank(viewers, positions)
+
+    start = time.perf_counter()
+    exact, exact_sims = topk_neighbors(matrix, tb_rank, top_k=top_k, return_sims=True)
+    exact_time = time.perf_counter() - start
+
+    if settings is None:
+        settings = [dict(DEFAULT_LSH_OPTIONS, bands=b, rows_per_band=r, max_bucket=m)
+                    for b, r, m in [(8, 2, 8), (16, 2, 8), (16, 2, 16), (32, 2, 16), (32, 2, 32), (32, 1, 32)]]
+
+    rows = [{'engine': 'exact', 'bands': None, 'rows_per_band': None, 'max_bucket': None,
+             f'recall@{top_k}': 1.0, 'seconds': round(exact_time, 3)}]
+    for options in settings:
+        start = time.perf_counter()
+        approx = lsh_neighbors(matrix, tb_rank, top_k=top_k, **options)
+        elapsed = time.perf_counter() - start
+        rows.append({'engine': 'lsh', 'bands': options['bands'], 'rows_per_band': options['rows_per_band'],
+                     'max_bucket': options['max_bucket'],
+                     f'recall@{top_k}': round(recall_at_k(exact, exact_sims, approx), 4),
+                     'seconds': round(elapsed, 3)})
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    # 사용법: python -m steps.similarity_ann [CSV 경로]
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else "./data/영화DB(임시).csv"
+    print(recall_report(pd.read_csv(csv_path)).to_string(index=False))
@@ -0,0 +1,277 @@
+import json
+import os
+import shutil
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+from steps.step3_recommend import (
+    DEFAULT_BLOCK_SIZE, _select_topk, keyword_sentences, tiebreak_rank, topk_neighbors,
+)
+
+# 마지막 전체 재구축 이후 추가/변경된 행 비율이 이 값을 넘으면 어휘(vocabulary)를 새로 학습
+DEFAULT_REBUILD_RATIO = 0.2
+
+
+def _row_keys(df, index):
+    """행 식별 키: 영화명 + 같은 제목 내 등장 순번 (동명 영화 구분용)"""
+    titles = df.loc[index, '영화명'].astype(str)
+    occurrence = titles.groupby(titles).cumcount().astype(str)
+    return (titles + '\x1f' + occurrence).to_numpy()
+
+
+def _catalog_rows(df, tiebreak_col):
+    """카탈로그에서 유사도 계산 대상 행의 (키, 제목, 키워드 문장, 동점 기준값, 원본 위치)를 추출"""
+    sentences = keyword_sentences(df)
+    keys = _row_keys(df, sentences.index)
+    titles = df.loc[sentences.index, '영화명'].to_numpy()
+    if tiebreak_col in df.columns:
+        viewers = pd.to_numeric(df.loc[sentences.index, tiebreak_col], errors='coerce').fillna(-np.inf).to_numpy()
+    else:
+        viewers = np.full(len(sentences), -np.inf)
+    positions = df.index.get_indexer(sentences.index)
+    return keys, titles, sentences.to_numpy(), viewers, positions
+
+
+class SimilarityIndex:
+    """
+    유사작 계산 결과를 디스크에 보관하는 인덱스.
+    학습된 TF-IDF 어휘, 희소 벡터, 행별 top-k 이웃(과 유사도)을 저장하고,
+    새로 들어오거나 바뀐 행만 다시 계산하여 기존 행의 top-k 목록을 갱신합니다.
+    증분 갱신 중에는 어휘/IDF가 고정되므로, 변경이 누적되면 rebuild()로 전체를 다시 만듭니다.
+    """
+
+    def __init__(self, vectorizer, matrix, keys, titles, docs, viewers, neighbors, sims,
+                 top_k, tiebreak_col, changed_since_rebuild=0, size_at_rebuild=0):
+        self.vectorizer = vectorizer
+        self.matrix = matrix
+        self.keys = keys
+        self.titles = titles
+        self.docs = docs
+        self.viewers = viewers
+        self.neighbors = neighbors      # (n, top_k), 빈 칸은 -1
+        self.sims = sims                # (n, top_k)
+        self.top_k = top_k
+        self.tiebreak_col = tiebreak_col
+        self.changed_since_rebuild = changed_since_rebuild
+        self.size_at_rebuild = size_at_rebuild
+
+    # --- 생성 / 저장 ---
+    @classmethod
+    def build(cls, df, top_k=5, tiebreak_col='매력도', block_size=DEFAULT_BLOCK_SIZE, n_jobs=1):
+        """카탈로그 전체로 어휘를 새로 학습하고 모든 행의 top-k를 계산합니다. (full rebuild)"""
+        keys, titles, docs, viewers, positions = _catalog_rows(df, tiebreak_col)
+        vectorizer = TfidfVectorizer(ngram_range=(1, 2))
+        if len(docs):
+            matrix = vectorizer.fit_transform(docs).tocsr()
+        else:
+            matrix = sparse.csr_matrix((0, 0))
+        index = cls(vectorizer, matrix, keys, titles, docs, viewers,
+                    np.full((len(keys), top_k), -1, dtype=np.int64), np.zeros((len(keys), top_k)),
+                    top_k, tiebreak_col, 0, len(keys))
+        if len(keys):
+            index._recompute(np.arange(len(keys)), tiebreak_rank(viewers, positions), block_size, n_jobs)
+        return index
+
+    def save(self, index_dir):
+        """인덱스를 임시 폴더에 쓴 뒤 교체하여, 중간에 실패해도 기존 인덱스가 깨지지 않도록 저장"""
+        tmp_dir = index_dir.rstrip('/\\') + '.tmp'
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        joblib.dump(self.vectorizer, os.path.join(tmp_dir, 'vectorizer.joblib'))
+        sparse.save_npz(os.path.join(tmp_dir, 'matrix.npz'), self.matrix)
+        np.savez(os.path.join(tmp_dir, 'rows.npz'),
+                 keys=self.keys.astype(str), titles=self.titles.astype(str), docs=self.docs.astype(str),
+                 viewers=self.viewers, neighbors=self.neighbors, sims=self.sims)
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                'top_k': self.top_k,
+                'tiebreak_col': self.tiebreak_col,
+                'changed_since_rebuild': self.changed_since_rebuild,
+                'size_at_rebuild': self.size_at_rebuild,
+            }, f, ensure_ascii=False)
+
+        old_dir = index_dir.rstrip('/\\') + '.old'
+        shutil.rmtree(old_dir, ignore_errors=True)
+        if os.path.exists(index_dir):
+            os.replace(index_dir, old_dir)
+        os.replace(tmp_dir, index_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+    @classmethod
+    def load(cls, index_dir):
+        """저장된 인덱스를 불러옵니다. 없으면 None"""
+        meta_path = os.path.join(index_dir, 'meta.json')
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        rows = np.load(os.path.join(index_dir, 'rows.npz'))
+        return cls(
+            joblib.load(os.path.join(index_dir, 'vectorizer.joblib')),
+            sparse.load_npz(os.path.join(index_dir, 'matrix.npz')).tocsr(),
+            rows['keys'].astype(object), rows['titles'].astype(object), rows['docs'].astype(object),
+            rows['viewers'], rows['neighbors'], rows['sims'],
+            meta['top_k'], meta['tiebreak_col'], meta['changed_since_rebuild'], meta['size_at_rebuild'],
+        )
+
+    # --- 갱신 ---
+    def _recompute(self, rows, tb_rank, block_size, n_jobs=1):
+        """지정한 행들의 top-k를 전체 카탈로그 대상으로 다시 계산"""
+        nbrs, sims = topk_neighbors(self.matrix, tb_rank, top_k=self.top_k, rows=rows,
+                                    block_size=block_size, return_sims=True, n_jobs=n_jobs)
+        for r, cols, vals in zip(rows, nbrs, sims):
+            self.neighbors[r] = -1
+            self.sims[r] = 0
+            self.neighbors[r, :len(cols)] = cols
+            self.sims[r, :len(vals)] = vals
+
+    def _remove(self, drop_mask):
+        """행 삭제 후 이웃 번호를 다시 매기고, 삭제된 행을 이웃으로 가졌던 행 번호를 반환"""
+        keep = ~drop_mask
+        remap = np.cumsum(keep) - 1
+        remap[drop_mask] = -1
+
+        neighbors = self.neighbors[keep]
+        valid = neighbors >= 0
+        mapped = np.where(valid, remap[np.where(valid, neighbors, 0)], -1)
+        dirty = np.flatnonzero(((mapped < 0) & valid).any(axis=1))
+
+        self.matrix = self.matrix[keep]
+        self.keys, self.titles = self.keys[keep], self.titles[keep]
+        self.docs, self.viewers = self.docs[keep], self.viewers[keep]
+        self.neighbors, self.sims = mapped, self.sims[keep]
+        return dirty
+
+    def update(self, df, block_size=DEFAULT_BLOCK_SIZE, max_changes=None, n_jobs=1):
+        """
+        카탈로그(df)와 인덱스를 비교하여 추가/변경/삭제된 행만 반영합니다.
+        - 추가/변경된 행: 고정된 어휘로 벡터화한 뒤 전체 카탈로그 대상으로 top-k 계산
+        - 기존 행: 새 행이 기존 top-k를 밀어낼 수 있는 경우에만 병합 갱신
+        - 삭제/변경된 행을 이웃으로 가졌던 행: top-k 전체 재계산
+        변경 내역 통계(dict)를 반환합니다.
+        재구축 이후 누적 변경 행 수가 max_changes를 넘으면 아무것도 바꾸지 않고 None을 반환합니다.
+        """
+        keys, titles, docs, viewers, _ = _catalog_rows(df, self.tiebreak_col)
+        stored = pd.Series(np.arange(len(self.keys)), index=self.keys)
+        pos = stored.reindex(keys).to_numpy()
+        known = ~np.isnan(pos)
+        pos_known = pos[known].astype(np.int64)
+        same = (self.docs[pos_known] == docs[known]) & (self.viewers[pos_known] == viewers[known])
+
+        unchanged = np.zeros(len(self.keys), dtype=bool)
+        unchanged[pos_known[same]] = True
+        incoming = np.flatnonzero(~known)
+        incoming = np.sort(np.concatenate([incoming, np.flatnonzero(known)[~same]]))
+        if max_changes is not None and self.changed_since_rebuild + len(incoming) > max_changes:
+            return None
+        stats = {'mode': 'incremental', 'added': int((~known).sum()), 'changed': int((~same).sum()),
+                 'removed': int((~unchanged).sum()) - int((~same).sum()), 'recomputed': 0}
+
+        dirty = self._remove(~unchanged) if (~unchanged).any() else np.empty(0, dtype=np.int64)
+        n_old = len(self.keys)
+
+        if len(incoming):
+            new_matrix = self.vectorizer.transform(docs[incoming])
+            self.matrix = sparse.vstack([self.matrix, new_matrix]).tocsr()
+            self.keys = np.concatenate([self.keys, keys[incoming]])
+            self.titles = np.concatenate([self.titles, titles[incoming]])
+            self.docs = np.concatenate([self.docs, docs[incoming]])
+            self.viewers = np.concatenate([self.viewers, viewers[incoming]])
+            self.neighbors = np.vstack([self.neighbors, np.full((len(incoming), self.top_k), -1, dtype=np.int64)])
+            self.sims = np.vstack([self.sims, np.zeros((len(incoming), self.top_k))])
+
+        n = len(self.keys)
+        if n == 0 or (len(incoming) == 0 and len(dirty) == 0):
+            return stats
+
+        # 증분 갱신 중의 최후 동점 기준은 인덱스에 들어온 순서 (rebuild 시 카탈로그 순서로 초기화)
+        tb_rank = tiebreak_rank(self.viewers, np.arange(n))
+        new_rows = np.arange(n_old, n)
+        self._recompute(np.concatenate([dirty, new_rows]), tb_rank, block_size, n_jobs)
+        stats['recomputed'] = len(dirty) + len(new_rows)
+
+        if len(new_rows) and n_old:
+            self._merge_new_rows(n_old, new_rows, tb_rank, np.setdiff1d(np.arange(n_old), dirty))
+
+        self.changed_since_rebuild += len(incoming)
+        return stats
+
+    def _merge_new_rows(self, n_old, new_rows, tb_rank, candidates):
+        """
+        새 행이 기존 행의 top-k를 밀어내는 경우만 골라 병합합니다.
+        (기존 top-k) ∪ (새 행 후보) 의 상위 k개는 전체 재계산 결과와 같습니다.
+        """
+        k = min(self.top_k, len(self.keys) - 1)
+        normalized = normalize(self.matrix)
+        # (기존 행, 새 행) 유사도. 기존 행 기준으로 곱해야 전체 재계산과 덧셈 순서가 같아 값이 비트 단위로 일치
+        cross = (normalized[:n_old] @ normalized[new_rows].T).tocsr()
+
+        # 유사도 0으로도 밀어낼 수 있는 새 행은 동점 순위가 가장 앞선 k개뿐
+        zero_fill = new_rows[np.argsort(tb_rank[new_rows], kind='stable')[:k]]
+
+        valid = self.neighbors[candidates] >= 0
+        has_zero_slot = ((self.sims[candidates] <= 0) & valid).any(axis=1) | (valid.sum(axis=1) < k)
+        has_new_sim = np.diff(cross.indptr)[candidates] > 0
+        affected = candidates[has_zero_slot | has_new_sim]
+
+        for r in affected:
+            lo, hi = cross.indptr[r], cross.indptr[r + 1]
+            new_cols = new_rows[cross.indices[lo:hi]]
+            new_sims = cross.data[lo:hi]
+            zero_cols = zero_fill[~np.isin(zero_fill, new_cols)]
+            cur = self.neighbors[r] >= 0
+            cols = np.concatenate([self.neighbors[r][cur], new_cols, zero_cols])
+            sims = np.concatenate([self.sims[r][cur], new_sims, np.zeros(len(zero_cols))])
+            top, top_sims = _select_topk(cols, sims, k, tb_rank)
+            self.neighbors[r] = -1
+            self.sims[r] = 0
+            self.neighbors[r, :len(top)] = top
+            self.sims[r, :len(top_sims)] = top_sims
+
+    # --- 조회 ---
+    def similars(self, df):
+        """카탈로그 행 순서에 맞춘 '유사작' 문자열 목록"""
+        sentences = keyword_sentences(df)
+        keys = _row_keys(df, sentences.index)
+        rows = pd.Series(np.arange(len(self.keys)), index=self.keys).reindex(keys).to_numpy()
+        positions = df.index.get_indexer(sentences.index)
+
+        out = [""] * len(df)
+        for pos, r in zip(positions, rows):
+            if np.isnan(r):
+                continue
+            nbrs = self.neighbors[int(r)]
+            out[pos] = ", ".join(self.titles[nbrs[nbrs >= 0]])
+        return out
+
+
+def update_similars(df, index_dir, top_k=5, tiebreak_col='매력도', rebuild=False,
+                    rebuild_ratio=DEFAULT_REBUILD_RATIO, block_size=DEFAULT_BLOCK_SIZE, n_jobs=1):
+    """
+    저장된 유사작 인덱스를 카탈로그에 맞게 갱신하고 '유사작' 목록을 반환합니다.
+    인덱스가 없거나, 설정이 바뀌었거나, rebuild=True이거나,
+    마지막 재구축 이후 변경 행 비율이 rebuild_ratio를 넘으면 전체를 다시 만듭니다.
+    """
+    index = None if rebuild else SimilarityIndex.load(index_dir)
+    if index is not None and (index.top_k != top_k or index.tiebreak_col != tiebreak_col):
+        index = None
+
+    if index is not None:
+        stats = index.update(df, block_size=block_size,
+                             max_changes=rebuild_ratio * max(index.size_at_rebuild, 1), n_jobs=n_jobs)
+        if stats is None:
+            index = None
+
+    if index is None:
+        index = SimilarityIndex.build(df, top_k=top_k, tiebreak_col=tiebreak_col,
+                                      block_size=block_size, n_jobs=n_jobs)
+        stats = {'mode': 'rebuild', 'rows': len(index.keys)}
+
+    index.save(index_dir)
+    print(f"✅ 유사작 인덱스 갱신: {stats}")
+    return index.similars(df)
@@ -1,14 +1,18 @@
 import pandas as pd
 from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
+import queue
+import threading
 import time
-import re
-from urllib.parse import quote
 import numpy as np
 
+from steps.crawl_journal import CrawlJournal
+from steps.naver_parse import MODULE_SELECTOR, parse_audience_count, parse_movie_page, search_url
+from steps.rate_limit import AdaptiveRateLimiter, RetryPolicy, is_failure
+
 # --- 설정 ---
 input_csv_file = '영화 정보 탐색 - Database.csv'
 output_csv_file = '영화 정보 탐색 - Database_updated.csv'
@@ -16,128 +20,238 @@ title_column = '영화명'
 netizen_rating_column = '네티즌 평점'
 interest_column = '네이버 관심도(찜)'
 audience_column = '누적 관객수'
+journal_file = '영화 정보 탐색 - crawl_journal.jsonl'  # 중단 후 이어받기용 크롤링 기록
+worker_count = 2        # 동시에 띄우는 브라우저 수
+max_pages = 200         # 드라이버 하나로 처리한 뒤 새로 띄우는 페이지 수
+page_timeout = 15       # 페이지 로딩 제한 시간 (초)
+wait_timeout = 5        # 영화 정보 섹션을 기다리는 시간 (초)
 # -----------
 
-# --- 셀레니움 드라이버 자동 설정 ---
-driver = None
-try:
-    options = webdriver.ChromeOptions()
-    options.add_argument('headless')  # 브라우저 창을 띄우지 않고 백그라운드에서 실행
-    options.add_argument('window-size=1920x1080')
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
-    options.add_argument("--log-level=3") # 콘솔의 불필요한 로그 최소화
-
-    # 이 한 줄이 자동으로 chromedriver를 다운로드하고 설정합니다.
-    driver = webdriver.Chrome(options=options)
-    print("✅ 웹 드라이버가 성공적으로 시작되었습니다. (자동 설정 완료)")
-
-except Exception as e:
-    print(f"❌ [오류] 크롬 드라이버 자동 설정에 실패했습니다. 다음을 확인해주세요:")
-    print("1. 인터넷 연결 상태를 확인해주세요.")
-    print("2. 크롬 브라우저가 최신 버전인지 확인해주세요.")
-    print(f"3. 오류 메시지: {e}")
+# --- 셀레니움 드라이버 설정 (import 시점이 아니라 처음 필요할 때 생성) ---
+def create_driver(page_timeout=page_timeout):
+    try:
+        options = webdriver.ChromeOptions()
+        options.add_argument('headless')  # 브라우저 창을 띄우지 않고 백그라운드에서 실행
+        options.add_argument('window-size=1920x1080')
+        options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
+        options.add_argument("--log-level=3") # 콘솔의 불필요한 로그 최소화
+
+        # 이 한 줄이 자동으로 chromedriver를 다운로드하고 설정합니다.
+        driver = webdriver.Chrome(options=options)
+        driver.set_page_load_timeout(page_timeout) # 응답 없는 페이지에서 무한정 멈추지 않도록
+        print("✅ 웹 드라이버가 성공적으로 시작되었습니다. (자동 설정 완료)")
+        return driver
+
+    except Exception as e:
+        print(f"❌ [오류] 크롬 드라이버 자동 설정에 실패했습니다. 다음을 확인해주세요:")
+        print("1. 인터넷 연결 상태를 확인해주세요.")
+        print("2. 크롬 브라우저가 최신 버전인지 확인해주세요.")
+        print(f"3. 오류 메시지: {e}")
+        raise
+
+def _quit(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+_shared_driver = None
+
+def get_driver():
+    """get_movie_data_with_selenium에서 driver를 넘기지 않았을 때 쓰는 공용 드라이버"""
+    global _shared_driver
+    if _shared_driver is None:
+        _shared_driver = create_driver()
+    return _shared_driver
 # ------------------------------------
 
-def parse_audience_count(text):
-    """'만', '억' 등의 문자를 숫자로 변환하는 함수"""
-    if not isinstance(text, str): return 'N/A'
-    text = text.replace(',', '').lower()
-    num = 0
-    if '억' in text:
-        try: num += float(re.search(r'([\d]+\.?\d*)억', text).group(1)) * 100000000
-        except: pass
-    if '만' in text:
-        try: num += float(re.search(r'([\d]+\.?\d*)만', text).group(1)) * 10000
-        except: pass
-    if num > 0: return str(int(num))
+class PageNotReady(Exception):
+    """영화 정보 섹션이 제한 시간 안에 나타나지 않음 (드라이버는 정상)"""
+
+def load_movie_page(driver, movie_title, wait_timeout=wait_timeout, cache=None):
+    """
+    드라이버로 검색 결과를 열어 (평점, 관심도, 관객수)를 추출합니다. 실패 시 예외를 그대로 전달
+    cache(PageCache)가 주어지면 렌더링된 페이지를 저장합니다.
+    """
+    url = search_url(movie_title)
+    driver.get(url)
+    # 영화 정보 섹션이 화면에 나타날 때까지 최대 wait_timeout초간 기다립니다.
     try:
-        return str(int(re.search(r'(\d+)', text).group(1)))
-    except:
-        return 'N/A'
+        WebDriverWait(driver, wait_timeout).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, MODULE_SELECTOR))
+        )
+    except TimeoutException as e:
+        raise PageNotReady(str(e)) from e
+    html = driver.page_source
+    if cache is not None:
+        cache.put(url, html)
+    return parse_movie_page(html)
 
-def get_movie_data_with_selenium(movie_title):
+def get_movie_data_with_selenium(movie_title, driver=None):
     """
     셀레니움을 사용하여 네이버 통합 검색 결과에서 영화 정보를 크롤링합니다.
     """
-    search_url = f"https://search.naver.com/search.naver?query={quote(movie_title + ' 영화')}"
     try:
-        driver.get(search_url)
-        # 영화 정보 섹션이 화면에 나타날 때까지 최대 5초간 기다립니다.
-        WebDriverWait(driver, 5).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "div.sc_new.cs_common_module"))
-        )
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
+        return load_movie_page(driver or get_driver(), movie_title)
 
-        movie_section = soup.select_one("div.sc_new.cs_common_module._au_movie_content_wrap")
-        if not movie_section:
-            return 'Not Found', 'Not Found', 'Not Found'
+    except Exception as e:
+        print(f"  [오류] '{movie_title}' 처리 중 페이지 로딩 또는 요소 찾기 실패: {e}")
+        return 'Error', 'Error', 'Error'
 
-        rating, interest, audience_count = 'N/A', 'N/A', 'N/A'
+class DriverPool:
+    """
+    headless Chrome 작업자 workers개가 공유 큐에서 (인덱스, 제목)을 꺼내 처리합니다.
+    - 드라이버는 작업자가 처음 페이지를 열 때 만듭니다.
+    - max_pages 페이지를 처리했거나 페이지 로딩 중 오류(응답 없음/브라우저 종료 등)가 나면 드라이버를 새로 띄웁니다.
+    - 페이지마다 page_timeout(로딩), wait_timeout(섹션 대기) 제한 시간을 적용하므로
+      멈춘 페이지 하나가 전체 크롤링을 붙잡지 않습니다.
+    - cache(PageCache)가 주어지면 기간 안에 저장된 페이지는 브라우저 없이 바로 추출합니다.
+    - limiter(AdaptiveRateLimiter)가 주어지면 고정 delay 대신 작업자 전체의 요청 속도를 조절하고,
+      retry(RetryPolicy)가 주어지면 'Error'/'N/A' 결과를 간격을 늘려 가며 다시 시도합니다.
+    """
 
-        # 각 정보 추출 시, 요소가 없는 경우를 대비해 try-except로 안전하게 처리
-        try:
-            # 실관람객 평점 우선
-            rating_element = movie_section.select_one("a.lego_rating_box_see .area_star_number")
-            if rating_element:
-                rating = re.search(r'(\d+\.?\d*)', rating_element.get_text(strip=True)).group(1)
-            else: # 없으면 네티즌 평점
-                rating_dt = movie_section.find('dt', string='평점')
-                if rating_dt and rating_dt.find_next_sibling('dd'):
-                    rating = rating_dt.find_next_sibling('dd').get_text(strip=True)
-        except Exception:
-            pass # 평점 정보가 없으면 'N/A' 유지
+    def __init__(self, workers=worker_count, max_pages=max_pages, page_timeout=page_timeout,
+                 wait_timeout=wait_timeout, delay=0.5, driver_factory=create_driver, on_result=None,
+                 cache=None, limiter=None, retry=None):
+        self.workers = workers
+        self.max_pages = max_pages
+        self.page_timeout = page_timeout
+        self.wait_timeout = wait_timeout
+        self.delay = delay
+        self.driver_factory = driver_factory
+        self.on_result = on_result      # on_result(인덱스, 제목, 결과) — 작업자 스레드에서 호출
+        self.cache = cache
+        self.limiter = limiter
+        self.retry = retry
+        self.restarts = 0
 
-        try:
-            interest_element = movie_section.select_one("span._like_count")
-            if interest_element:
-                interest = interest_element.get_text(strip=True).replace(',', '')
-        except Exception:
-            pass # 관심도 정보가 없으면 'N/A' 유지
+    def crawl(self, items):
+        """items: (인덱스, 제목) 목록. {인덱스: (평점, 관심도, 관객수)}를 반환합니다."""
+        tasks = queue.Queue()
+        for item in items:
+            tasks.put(item)
+        results = {}
+        threads = [threading.Thread(target=self._worker, args=(tasks, results), daemon=True)
+                   for _ in range(max(1, min(self.workers, tasks.qsize())))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return results
 
+    def _worker(self, tasks, results):
+        driver, pages = None, 0
         try:
-            audience_dt = movie_section.find('dt', string='관객수')
-            if audience_dt and audience_dt.find_next_sibling('dd'):
-                audience_text = audience_dt.find_next_sibling('dd').get_text(strip=True)
-                audience_count = parse_audience_count(audience_text)
-        except Exception:
-            pass # 관객수 정보가 없으면 'N/A' 유지
+            while True:
+                try:
+                    index, title = tasks.get_nowait()
+                except queue.Empty:
+                    break
+                # 기간 안에 캐시된 페이지의 결과는 다시 시도하지 않음 (naver_async와 같은 규칙)
+                html = self.cache.get(search_url(title)) if self.cache is not None else None
+                if html is not None:
+                    results[index] = parse_movie_page(html)
+                    if self.on_result:
+                        self.on_result(index, title, results[index])
+                    continue
 
-        return rating, interest, audience_count
+                attempt = 0
+                while True:
+                    if self.limiter is not None:
+                        self.limiter.acquire()
+                    result, driver, pages = self._load(driver, pages, title)
+                    if self.limiter is not None:
+                        if is_failure(result):
+                            self.limiter.on_failure()
+                        else:
+                            self.limiter.on_success()
+                    if self.retry is None or not self.retry.should_retry(result, attempt):
+                        break
+                    if self.limiter is not None:
+                        self.limiter.on_retry()
+                    time.sleep(self.retry.delay(attempt))
+                    attempt += 1
+                results[index] = result
+                if self.on_result:
+                    self.on_result(index, title, result)
+                if self.limiter is None:
+                    time.sleep(self.delay) # 서버 부하를 줄이기 위한 짧은 대기
+        finally:
+            if driver is not None:
+                _quit(driver)
 
-    except Exception as e:
-        print(f"  [오류] '{movie_title}' 처리 중 페이지 로딩 또는 요소 찾기 실패: {e}")
-        return 'Error', 'Error', 'Error'
+    def _load(self, driver, pages, title):
+        """페이지 하나를 열어 (결과, 드라이버, 처리한 페이지 수)를 반환 (필요하면 드라이버를 새로 띄우거나 종료)"""
+        result = ('Error', 'Error', 'Error')
+        try:
+            if driver is None:
+                driver, pages = self.driver_factory(self.page_timeout), 0
+            result = load_movie_page(driver, title, self.wait_timeout, self.cache)
+        except PageNotReady as e:
+            print(f"  [오류] '{title}' 처리 중 요소 찾기 실패: {e}")
+        except Exception as e:
+            print(f"  [오류] '{title}' 처리 중 페이지 로딩 실패, 드라이버를 다시 시작합니다: {e}")
+            if driver is not None:
+                _quit(driver)
+                self.restarts += 1
+            driver = None
 
-# --- 메인 코드 실행 ---
-if driver:
-    try:
-        df = pd.read_csv(input_csv_file)
-        print(f"✅ '{input_csv_file}' 파일을 성공적으로 불러왔습니다.")
+        pages += 1
+        if driver is not None and pages >= self.max_pages:
+            _quit(driver)
+            driver = None
+        return result, driver, pages
 
-        for col in [netizen_rating_column, interest_column, audience_column]:
-            if col not in df.columns: df[col] = np.nan
-            df[col] = df[col].astype(object)
+def crawl_missing(df, delay=0.5, workers=worker_count, journal=None, **pool_options):
+    """
+    평점 정보가 없는 영화만 네이버에서 크롤링하여 채운 DataFrame을 반환합니다. (원본 df는 수정하지 않음)
+    workers개의 브라우저가 나누어 처리하고, 결과는 인덱스 기준으로 합칩니다.
+    journal(CrawlJournal)이 주어지면 지난 실행에서 받아 둔 결과를 먼저 채우고, 새 결과도 기록합니다.
+    요청 속도는 브라우저 수 / delay (초당)에서 시작해 오류가 나면 줄이고, 잘 되면 조금씩 올립니다.
+    """
+    df = df.copy()
+    for col in [netizen_rating_column, interest_column, audience_column]:
+        if col not in df.columns: df[col] = np.nan
+        df[col] = df[col].astype(object)
+    if journal is not None:
+        df, resumed = journal.apply(df, title_column)
+        print(f"✅ 크롤링 기록에서 {resumed}편을 이어받았습니다.")
 
-        print("\n🚀 셀레니움을 이용한 크롤링을 시작합니다.")
-        for index, row in df.iterrows():
-            # CSV 파일에 평점 정보가 없는 영화만 새로 크롤링
-            if pd.isna(row[netizen_rating_column]):
-                title = row[title_column]
-                print(f"({index + 1}/{len(df)}) '{title}' 정보 수집 중...", end="")
+    # CSV 파일에 평점 정보가 없는 영화만 새로 크롤링
+    missing = df.index[df[netizen_rating_column].isna()]
+    print(f"\n🚀 셀레니움을 이용한 크롤링을 시작합니다. ({len(missing)}/{len(df)}편, 브라우저 {workers}개)")
 
-                rating, interest, audience = get_movie_data_with_selenium(title)
+    def report(index, title, result):
+        rating, interest, audience = result
+        print(f"({index + 1}/{len(df)}) '{title}' -> 평점: {rating}, 관심도: {interest}, 관객수: {audience}")
+        if journal is not None:
+            journal.record(title, result)
 
-                df.at[index, netizen_rating_column] = rating
-                df.at[index, interest_column] = interest
-                df.at[index, audience_column] = audience
+    pool_options.setdefault('limiter', AdaptiveRateLimiter(rate=workers / delay))
+    pool_options.setdefault('retry', RetryPolicy())
+    pool = DriverPool(workers=workers, delay=delay, on_result=report, **pool_options)
+    results = pool.crawl(zip(missing, df.loc[missing, title_column]))
+    if journal is not None:
+        journal.flush()
+    if pool.limiter is not None:
+        print(f"✅ 요청 통계: {pool.limiter.stats()}")
+    for index, (rating, interest, audience) in results.items():
+        df.at[index, netizen_rating_column] = rating
+        df.at[index, interest_column] = interest
+        df.at[index, audience_column] = audience
+    return df
 
-                print(f" -> 평점: {rating}, 관심도: {interest}, 관객수: {audience}")
+# --- 메인 코드 실행 ---
+if __name__ == "__main__":
+    try:
+        df = pd.read_csv(input_csv_file)
+        print(f"✅ '{input_csv_file}' 파일을 성공적으로 불러왔습니다.")
 
-                time.sleep(0.5) # 서버 부하를 줄이기 위한 짧은 대기
-            else:
-                print(f"({index + 1}/{len(df)}) '{row[title_column]}' 정보는 이미 있어 건너뜁니다.")
+        journal = CrawlJournal(journal_file)
+        df = crawl_missing(df, journal=journal)
 
         df.to_csv(output_csv_file, index=False, encoding='utf-8-sig')
+        journal.clear() # 결과 파일에 반영되었으므로 기록 정리
         print(f"\n✨ 모든 작업이 완료되었습니다. 결과가 '{output_csv_file}' 파일에 저장되었습니다.")
 
     except FileNotFoundError:
@@ -145,5 +259,6 @@ if driver:
     except Exception as e:
         print(f"❌ 작업 중 예기치 않은 오류가 발생했습니다: {e}")
     finally:
-        driver.quit() # 작업이 끝나면 반드시 브라우저 종료
-        print("✅ 웹 드라이버가 종료되었습니다.")
\ No newline at end of file
+        if _shared_driver is not None:
+            _quit(_shared_driver) # 작업이 끝나면 반드시 브라우저 종료
+        print("✅ 웹 드라이버가 종료되었습니다.")
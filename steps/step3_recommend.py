@@ -1,96 +1,216 @@
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
+from scipy import sparse
 import numpy as np
 import pandas as pd
 
-def find_similars(df, top_k=5, tiebreak_col='매력도'):
-    
-    
-    df_copy = df.dropna(subset=['Gemini 키워드']).copy()
-    df_copy['Gemini 키워드'] = df_copy['Gemini 키워드'].apply(
+from steps.parallel import resolve_n_jobs, run_sharded
+
+# 유사도 계산 시 한 번에 처리할 행 수 (N×N 행렬 대신 block_size×N 희소 블록만 생성)
+DEFAULT_BLOCK_SIZE = 1024
+
+
+def keyword_sentences(df):
+    """'Gemini 키워드'를 TF-IDF 입력 문장으로 변환 (키워드가 없는 행은 제외)"""
+    keywords = df['Gemini 키워드'].dropna()
+    keywords = keywords.apply(
         lambda x: x.split(',') if isinstance(x, str)
         else (x if isinstance(x, list) else [])
     )
-    df_copy['Gemini문장'] = df_copy['Gemini 키워드'].apply(
-        lambda x: ' '.join([t.strip() for t in x])
-    )
+    return keywords.apply(lambda x: ' '.join([t.strip() for t in x]))
+
+
+def tiebreak_rank(viewers, positions):
+    """
+    동점 처리 순위를 계산합니다. (매력도 내림차순 → 원본 순서 오름차순)
+    반환값 rank[i]가 작을수록 같은 유사도에서 먼저 추천됩니다.
+    """
+    viewers = np.asarray(viewers, dtype=float)
+    order = np.lexsort((np.asarray(positions), -viewers))
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    return rank
+
+
+def _select_topk(cols, sims, k, tb_rank):
+    """한 행의 (후보, 유사도)에서 (유사도 내림차순, 동점 순위 오름차순) 상위 k개를 고릅니다."""
+    if len(cols) > k:
+        # argpartition 방식의 부분 선택: k번째 유사도를 기준값으로 잡고 동점만 따로 처리
+        thr = np.partition(sims, len(sims) - k)[len(sims) - k]
+        above = sims > thr
+        tie_cols = cols[sims == thr]
+        need = k - int(above.sum())
+        if len(tie_cols) > need:
+            tie_cols = tie_cols[np.argpartition(tb_rank[tie_cols], need - 1)[:need]]
+        cols = np.concatenate([cols[above], tie_cols])
+        sims = np.concatenate([sims[above], np.full(len(tie_cols), thr)])
+    order = np.lexsort((tb_rank[cols], -sims))
+    return cols[order], sims[order]
+
+
+def _topk_rows(matrix, matrix_t, tb_rank, tb_order, rows, k, block_size):
+    """정규화된 행렬(matrix)과 그 전치(matrix_t)로 rows의 top-k 이웃과 유사도를 계산"""
+    results, result_sims = [], []
+    for start in range(0, len(rows), block_size):
+        block_rows = rows[start:start + block_size]
+        sim_block = (matrix[block_rows] @ matrix_t).tocsr()
+        for i, r in enumerate(block_rows):
+            lo, hi = sim_block.indptr[i], sim_block.indptr[i + 1]
+            cols = sim_block.indices[lo:hi]
+            sims = sim_block.data[lo:hi]
+            keep = (cols != r) & (sims > 0)
+            cols, sims = cols[keep], sims[keep]
+
+            top, top_sims = _select_topk(cols, sims, k, tb_rank)
+            if len(top) < k:
+                # 유사도 0인 후보: 동점 순위 앞쪽에서 자기 자신/이미 뽑힌 후보를 제외하고 채움
+                head = tb_order[:k + len(cols) + 1]
+                head = head[~np.isin(head, cols) & (head != r)][:k - len(top)]
+                top = np.concatenate([top, head])
+                top_sims = np.concatenate([top_sims, np.zeros(len(head))])
+            results.append(top)
+            result_sims.append(top_sims)
+    return results, result_sims
+
+
+def _topk_shard(shared, rows, shape, k, block_size):
+    """병렬 작업 단위: 공유 배열로 희소 행렬을 복원하여 rows의 (이웃, 유사도)를 계산"""
+    matrix = sparse.csr_matrix((shared['data'], shared['indices'], shared['indptr']), shape=shape)
+    matrix_t = sparse.csr_matrix((shared['t_data'], shared['t_indices'], shared['t_indptr']),
+                                 shape=(shape[1], shape[0]))
+    results, result_sims = _topk_rows(matrix, matrix_t, shared['tb_rank'], shared['tb_order'],
+                                      rows, k, block_size)
+    return list(zip(results, result_sims))
+
+
+def topk_neighbors(matrix, tb_rank, top_k=5, rows=None, block_size=DEFAULT_BLOCK_SIZE,
+                   return_sims=False, n_jobs=1):
+    """
+    희소 TF-IDF 행렬에서 각 행의 코사인 유사도 상위 top_k 이웃을 구합니다.
+    유사도는 block_size 행 단위의 희소 블록으로만 계산하므로 N×N 행렬을 만들지 않습니다.
+    유사도가 0인 후보는 동점 순위(tb_rank) 순서로 채웁니다.
+    return_sims=True이면 (이웃 목록, 유사도 목록)을 함께 반환합니다.
+    n_jobs > 1 (또는 -1)이면 행을 나누어 여러 프로세스에서 계산합니다. (결과는 직렬과 동일)
+    """
+    matrix = normalize(matrix.tocsr())
+    n = matrix.shape[0]
+    rows = np.arange(n) if rows is None else np.asarray(rows, dtype=np.int64)
+    k = min(top_k, n - 1)
+    if k <= 0:
+        empty = [np.empty(0, dtype=np.int64) for _ in rows]
+        return (empty, [np.empty(0) for _ in rows]) if return_sims else empty
 
-    if df_copy.empty:
+    matrix_t = matrix.T.tocsr()
+    tb_rank = np.asarray(tb_rank)
+    tb_order = np.argsort(tb_rank, kind='stable')
+
+    if resolve_n_jobs(n_jobs) > 1:
+        shared = {
+            'data': matrix.data, 'indices': matrix.indices, 'indptr': matrix.indptr,
+            't_data': matrix_t.data, 't_indices': matrix_t.indices, 't_indptr': matrix_t.indptr,
+            'tb_rank': tb_rank, 'tb_order': tb_order,
+        }
+        pairs = run_sharded(_topk_shard, rows, shared, n_jobs,
+                            shape=matrix.shape, k=k, block_size=block_size)
+        results = [p[0] for p in pairs]
+        result_sims = [p[1] for p in pairs]
+    else:
+        results, result_sims = _topk_rows(matrix, matrix_t, tb_rank, tb_order, rows, k, block_size)
+    return (results, result_sims) if return_sims else results
+
+
+def find_similars(df, top_k=5, tiebreak_col='매력도', block_size=DEFAULT_BLOCK_SIZE,
+                  method='exact', lsh_options=None, n_jobs=1):
+    """
+    키워드 TF-IDF 코사인 유사도 기준 유사작 top_k를 찾습니다.
+    method='lsh'이면 MinHash LSH 근사 모드로 계산합니다. (lsh_options로 재현율/속도 조절,
+    steps/similarity_ann.py 참고)
+    n_jobs > 1 (또는 -1)이면 정확한 모드를 여러 프로세스로 나누어 계산합니다.
+    """
+    sentences = keyword_sentences(df)
+    if sentences.empty:
         return [""] * len(df)
 
-    
     tfidf = TfidfVectorizer(ngram_range=(1, 2))
-    tfidf_matrix = tfidf.fit_transform(df_copy['Gemini문장'])
-    sim = cosine_similarity(tfidf_matrix, tfidf_matrix)
+    tfidf_matrix = tfidf.fit_transform(sentences)
 
-    
-    copy_to_global = df_copy.index.to_numpy()                 # df 인덱스
-    global_to_pos  = {g:i for i,g in enumerate(df.index)}     # 원본 순서 유지용(최후 tie)
+    positions = df.index.get_indexer(sentences.index)         # 원본 순서 유지용(최후 tie)
+    if tiebreak_col in df.columns:
+        tb_viewers = pd.to_numeric(df.loc[sentences.index, tiebreak_col], errors='coerce').fillna(-np.inf).to_numpy()
+    else:
+        tb_viewers = np.full(len(sentences), -np.inf)
+    tb_rank = tiebreak_rank(tb_viewers, positions)
 
-  
-    if tiebreak_col in df_copy.columns:
-        tb_viewers = pd.to_numeric(df_copy[tiebreak_col], errors='coerce').fillna(-np.inf).to_numpy()
+    if method == 'lsh':
+        from steps.similarity_ann import DEFAULT_LSH_OPTIONS, lsh_neighbors
+        options = dict(DEFAULT_LSH_OPTIONS, **(lsh_options or {}))
+        neighbors = lsh_neighbors(tfidf_matrix, tb_rank, top_k=top_k, **options)
+    elif method == 'exact':
+        neighbors = topk_neighbors(tfidf_matrix, tb_rank, top_k=top_k, block_size=block_size, n_jobs=n_jobs)
     else:
-        
-        tb_viewers = np.full(len(df_copy), -np.inf)
-
-    results_map = {}
-    for local_idx in range(len(df_copy)):
-        sims = sim[local_idx].copy()
-        sims[local_idx] = -np.inf  
-
-        
-        cand = pd.DataFrame({
-            'local_idx': np.arange(len(df_copy)),
-            'sim': sims,
-            'viewers': tb_viewers
-        })
-        cand = cand[cand['local_idx'] != local_idx].copy()
-
-        
-        cand['orig_pos'] = cand['local_idx'].map(lambda li: global_to_pos[copy_to_global[li]])
-
-        
-        cand = cand.sort_values(
-            by=['sim', 'viewers', 'orig_pos'],
-            ascending=[False, False, True],
-            kind='mergesort'  
-        )
-
-        top_local  = cand['local_idx'].to_numpy()[:top_k]
-        top_global = copy_to_global[top_local]
-        titles     = df.loc[top_global, '영화명'].tolist()
-
-        me_global = copy_to_global[local_idx]
-        results_map[me_global] = titles
-
-    
+        raise ValueError(f"알 수 없는 method: {method}")
+
+    titles = df['영화명'].to_numpy()
+    out = [""] * len(df)
+    for pos, nbrs in zip(positions, neighbors):
+        out[pos] = ", ".join(titles[positions[nbrs]])
+    return out
+
+
+def _competitor_rows(order, lo, hi, codes, rows, top_k):
+    """
+    개봉일 순으로 정렬된 행 번호(order)에서 각 행의 기간 [lo, hi) 구간을 앞에서부터 훑어
+    제목이 다른 영화를 최대 top_k편 고릅니다. (구간 전체가 아니라 필요한 만큼만 확인)
+    """
     out = []
-    for ridx in df.index:
-        out.append(", ".join(results_map.get(ridx, [])))
+    for r in rows:
+        start, stop_all = lo[r], hi[r]
+        picked = []
+        need = top_k
+        while need > 0 and start < stop_all:
+            stop = min(stop_all, start + 2 * need)
+            chunk = order[start:stop]
+            chunk = chunk[codes[chunk] != codes[r]][:need]
+            picked.append(chunk)
+            need -= len(chunk)
+            start = stop
+        out.append(np.concatenate(picked) if picked else np.empty(0, dtype=np.int64))
     return out
 
 
+def _competitor_shard(shared, rows, top_k):
+    """병렬 작업 단위: 공유 배열로 rows의 경쟁작을 계산"""
+    return _competitor_rows(shared['order'], shared['lo'], shared['hi'], shared['title_codes'], rows, top_k)
+
+
 # 경쟁작 추천 함수
-def find_competitors(df):
-    df['개봉날짜'] = pd.to_datetime(df['개봉일'], format='%Y%m%d', errors='coerce')
-    competitors_list = []
-    for idx, row in df.iterrows():
-        movie_name = row['영화명']
-        release_date = row['개봉날짜']
-        if pd.isna(release_date):
-            competitors_list.append("")
-            continue
-        start_date = release_date - pd.Timedelta(days=7)
-        end_date = release_date + pd.Timedelta(days=7)
-        competitors_df = df[
-            (df['개봉날짜'] >= start_date) &
-            (df['개봉날짜'] <= end_date) &
-            (df['영화명'] != movie_name)
-        ].copy()
-        competitors_df = competitors_df.sort_values(by='개봉날짜').head(5)
-        competitors_titles = competitors_df['영화명'].tolist()
-        competitors_list.append(", ".join(competitors_titles))
-    df.drop('개봉날짜', axis=1, inplace=True)
-    return competitors_list
+def find_competitors(df, window_days=7, top_k=5, n_jobs=1):
+    """
+    개봉일 ±window_days 안에 개봉한 다른 제목의 영화를 개봉일 순(같은 날은 원본 순서)으로 최대 top_k편 찾습니다.
+    개봉일을 한 번 정렬해 두고 이진 탐색으로 기간을 찾으므로 O(N log N + 결과 수)이며, df는 수정하지 않습니다.
+    n_jobs > 1 (또는 -1)이면 여러 프로세스로 나누어 계산합니다. (결과는 직렬과 동일)
+    """
+    release = pd.to_datetime(df['개봉일'], format='%Y%m%d', errors='coerce')
+    dates = release.to_numpy(dtype='datetime64[ns]').astype(np.int64)
+    valid = release.notna().to_numpy()
+
+    order = np.flatnonzero(valid)
+    order = order[np.argsort(dates[order], kind='stable')]
+    sorted_dates = dates[order]
+    window = pd.Timedelta(days=window_days).value
+
+    # 개봉일이 없는 행은 빈 구간 (lo == hi)
+    lo = np.searchsorted(sorted_dates, dates - window, side='left')
+    hi = np.searchsorted(sorted_dates, dates + window, side='right')
+    hi[~valid] = lo[~valid]
+
+    codes = pd.factorize(df['영화명'])[0]
+    rows = np.arange(len(df))
+    if resolve_n_jobs(n_jobs) > 1:
+        shared = {'order': order, 'lo': lo, 'hi': hi, 'title_codes': codes}
+        competitors = run_sharded(_competitor_shard, rows, shared, n_jobs, top_k=top_k)
+    else:
+        competitors = _competitor_rows(order, lo, hi, codes, rows, top_k)
 
+    titles = df['영화명'].to_numpy()
+    return [", ".join(titles[c]) for c in competitors]
@@ -1,7 +1,29 @@
+import os
+import sys
+
+import numpy as np
 import pandas as pd
-import joblib
+
+from steps import model_registry
+
+# 모델 입력에 실제로 쓰이는 원본 컬럼 (나머지 컬럼은 복사/결측치 처리하지 않음)
+INPUT_COLUMNS = ['장르', '감독', '제작사', '실관람객 평점', '네티즌 평점', '네이버 관심도(찜)',
+                 'Gemini 키워드', '개봉일', '누적 관객수']
+FEATURE_COLUMNS = ['장르', '감독', '제작사', '실관람객 평점', '네티즌 평점', '네이버 관심도(찜)',
+                   '톤', '시대/배경', '주제', '개봉연도', '개봉월', '관객수_int']
+CATEGORICAL_COLUMNS = ['장르', '감독', '제작사', '톤', '시대/배경', '주제']
+# prepare_features의 변환 규칙이 바뀌면 올림 (파이프라인 체크포인트 무효화)
+FEATURE_VERSION = 3
+
+# 스트리밍 채점 시 한 번에 읽는 행 수
+DEFAULT_CHUNKSIZE = 50_000
+
 
 def convert_audience_to_int(audience_str):
+    """
+    모델 학습(steps/ML.ipynb)과 같은 관객수_int 규칙: '만'이 들어간 문자열만 숫자 × 10000, 그 외는 0.
+    화면/크롤러의 normalize.parse_counts와 다르지만, 모델을 다시 학습하기 전까지는 학습 때 입력과 맞추기 위해 이 규칙을 씁니다.
+    """
     if isinstance(audience_str, str):
         audience_str = audience_str.replace(',', '')
         if '만' in audience_str:
@@ -11,43 +33,128 @@ def convert_audience_to_int(audience_str):
                 return 0
     return 0
 
-def predict_attractiveness(df, encoder_path, model_path):
-    # 모델 로드
-    model = joblib.load(model_path)
-
-    # 예측에 사용할 feature 컬럼 지정 (예시: 필요에 따라 수정)
-    x = df.copy()
-    x = x.fillna(0)  # 결측치 0으로 대체
-
-    x['장르'] = x['장르'].str.split(',', expand=True)[0]
-    x['배우'] = x['배우'].str.split(',', expand=True)[0]
-    x['제작사'] = x['제작사'].str.split(',', expand=True)[0]
-    x['상영시간'] = x['상영시간'].astype(int)
-
-    keywords_split = x['Gemini 키워드'].str.split(',', expand=True)
-    keywords_split.columns = ['톤', '시대/배경', '주제']
-    x = pd.concat([x, keywords_split], axis=1)
-    x = x.drop('Gemini 키워드', axis=1)
-
-    x['국가'] = x['국가'].str.split(',', expand=True)[0]
-
-    x['관객수_int'] = x['누적 관객수'].apply(convert_audience_to_int)
-    bins = [0, 100000, 500000, 1000000, 5000000, 10000000, float('inf')]
-    labels = ['10만 미만', '10만 이상', '50만 이상', '100만 이상', '500만 이상', '1000만 이상']
-    x['관객수_categorical'] = pd.cut(x['관객수_int'], bins=bins, labels=labels, right=False)
-    
-    x['개봉일'] = pd.to_datetime(x['개봉일'], format = '%Y%m%d', errors='coerce')
-    x['개봉연도'] = x['개봉일'].dt.year
-    x['개봉월'] = x['개봉일'].dt.month
-    x['개봉연도'] = x['개봉연도'].fillna(0).astype(int) # 결측값 0으로 채우고 int형으로 자료형 변경
-    x['개봉월'] = x['개봉월'].fillna(0).astype(int)
-    x = x.drop('개봉일', axis = 1)
-    
-
-    x = x[['장르', '감독', '제작사','실관람객 평점', '네티즌 평점', '네이버 관심도(찜)', '톤', '시대/배경', '주제', '개봉연도', '개봉월', '관객수_int']]
-    categorical_cols = ['장르', '감독', '제작사', '톤', '시대/배경', '주제']
-    ord = joblib.load(encoder_path)
-    x[categorical_cols] = ord.transform(x[categorical_cols])
-
-    attractivenss_pred = model.predict(x)
+
+def audience_feature(values):
+    """convert_audience_to_int를 서로 다른 값마다 한 번씩만 적용한 int64 Series"""
+    codes, uniques = pd.factorize(values)
+    # 결측값(code -1)은 마지막 0
+    converted = np.array([convert_audience_to_int(v) for v in uniques] + [0], dtype=np.int64)
+    return pd.Series(converted[codes], index=values.index)
+
+
+def prepare_features(df, ord):
+    """
+    원본 데이터에서 모델 입력(FEATURE_COLUMNS 순서)을 만듭니다.
+    필요한 컬럼만 골라 결측치를 0으로 채우고, 콤마로 나뉜 값은 expand 없이 필요한 위치만 꺼냅니다.
+    ord가 None이면 범주형 인코딩 전 값을 그대로 반환합니다. (배열 모델이 직접 인코딩)
+    """
+    x = df[INPUT_COLUMNS].fillna(0)  # 결측치 0으로 대체
+
+    x['장르'] = x['장르'].str.split(',').str[0]
+    x['제작사'] = x['제작사'].str.split(',').str[0]
+
+    keywords = x['Gemini 키워드'].str.split(',')
+    x['톤'] = keywords.str[0]
+    x['시대/배경'] = keywords.str[1]
+    x['주제'] = keywords.str[2]
+
+    x['관객수_int'] = audience_feature(x['누적 관객수'])
+
+    release = pd.to_datetime(x['개봉일'], format = '%Y%m%d', errors='coerce')
+    x['개봉연도'] = release.dt.year.fillna(0).astype(int) # 결측값 0으로 채우고 int형으로 자료형 변경
+    x['개봉월'] = release.dt.month.fillna(0).astype(int)
+
+    x = x[FEATURE_COLUMNS]
+    if ord is not None:
+        x[CATEGORICAL_COLUMNS] = ord.transform(x[CATEGORICAL_COLUMNS])
+    return x
+
+
+def _load_predictor(encoder_path, model_path, mmap_mode=None, compiled_dir=None, cache=None):
+    """
+    (원본 DataFrame -> 예측값) 함수를 돌려줍니다.
+    compiled_dir에 현재 모델로 내보낸 배열 모델이 있으면 그것을, 없으면 sklearn 모델을 사용합니다.
+    cache(PredictionCache)가 주어지면 특성 지문이 캐시에 없는 행만 모델로 계산합니다.
+    """
+    # 배열 모델(numba)은 예측할 때만 import (UI 등 컬럼 정보만 쓰는 곳의 시작 시간 단축)
+    from steps import forest_export
+    if compiled_dir and forest_export.is_current(compiled_dir, model_path, encoder_path):
+        forest = model_registry.load_compiled(compiled_dir)
+        predict_features = forest.predict_features
+    else:
+        model, ord = model_registry.load_pair(model_path, encoder_path, mmap_mode=mmap_mode)
+
+        def predict_features(x):
+            x = x.copy()
+            x[CATEGORICAL_COLUMNS] = ord.transform(x[CATEGORICAL_COLUMNS])
+            return model.predict(x)
+
+    if cache is None:
+        return lambda frame: predict_features(prepare_features(frame, None))
+    return lambda frame: cache.predict(prepare_features(frame, None), predict_features)
+
+
+def _open_cache(cache_path, encoder_path, model_path):
+    from steps.prediction_cache import PredictionCache, model_version
+    return PredictionCache(cache_path, model_version(model_path, encoder_path))
+
+
+def _report_cache(cache):
+    print(f"✅ 매력도 예측 캐시: 적중 {cache.hits:,}/{cache.lookups:,}행 ({cache.hit_rate():.1%}), "
+          f"새로 계산 {cache.lookups - cache.hits:,}행")
+
+
+def predict_attractiveness(df, encoder_path, model_path, mmap_mode=None, compiled_dir=None, cache_path=None):
+    """
+    cache_path가 주어지면 (모델 버전, 특성 지문) 캐시를 사용하여 특성이 바뀐 행만 다시 예측합니다.
+    """
+    cache = _open_cache(cache_path, encoder_path, model_path) if cache_path else None
+    # 모델 로드 (프로세스당 한 번, 파일이 바뀌면 다시 로드)
+    predict = _load_predictor(encoder_path, model_path, mmap_mode, compiled_dir, cache)
+
+    attractivenss_pred = predict(df)
+    if cache is not None:
+        cache.save()
+        _report_cache(cache)
     return attractivenss_pred
+
+
+def score_csv_in_chunks(input_path, output_path, encoder_path, model_path,
+                        chunksize=DEFAULT_CHUNKSIZE, mmap_mode=None, compiled_dir=None, cache_path=None):
+    """
+    큰 카탈로그 CSV를 chunksize 행씩 읽어 '예측 매력도'를 붙인 뒤 바로 출력 파일에 이어 씁니다.
+    최대 메모리 사용량은 파일 크기가 아니라 chunksize에 비례합니다.
+    출력은 임시 파일에 쓴 뒤 마지막에 교체하므로 중간에 실패해도 기존 출력 파일은 그대로입니다.
+    처리한 행 수를 반환합니다.
+    """
+    cache = _open_cache(cache_path, encoder_path, model_path) if cache_path else None
+    predict = _load_predictor(encoder_path, model_path, mmap_mode, compiled_dir, cache)
+    tmp_path = output_path + '.tmp'
+    total = 0
+    try:
+        for i, chunk in enumerate(pd.read_csv(input_path, chunksize=chunksize)):
+            chunk['예측 매력도'] = predict(chunk)
+            if i == 0:
+                chunk.to_csv(tmp_path, index=False, encoding='utf-8-sig')
+            else:
+                # BOM은 파일 맨 앞에 한 번만
+                chunk.to_csv(tmp_path, index=False, header=False, mode='a', encoding='utf-8')
+            total += len(chunk)
+            print(f"  {total:,}행 채점 완료")
+        os.replace(tmp_path, output_path)
+        if cache is not None:
+            cache.save()
+            _report_cache(cache)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return total
+
+
+if __name__ == "__main__":
+    # 사용법: python -m steps.step4_attractiveness <입력 CSV> <출력 CSV> [chunksize]
+    chunksize = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_CHUNKSIZE
+    rows = score_csv_in_chunks(sys.argv[1], sys.argv[2], encoder_path='./steps/ordinal_encoder.pkl',
+                               model_path='./steps/rf_weighted_model.pkl', chunksize=chunksize,
+                               compiled_dir='./steps/rf_compiled', cache_path='./data/prediction_cache.npz')
+    print(f"✨ 총 {rows:,}행의 예측 매력도를 '{sys.argv[2]}'에 저장했습니다.")
@@ -8,9 +8,14 @@ from pathlib import Path
 import sys, os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 import main
+from steps.catalog_store import load_catalog
+from steps.normalize import normalize_catalog
+from catalog_index import CatalogIndex
 from filters import sidebar_filters
 from search import search_movies
-from display import show_movie_detail, display_movies_list
+from display import show_movie_detail, display_movies_page
+from refresh import RefreshService
+from distribution import Distribution
 
 # streamlit-card가 없을 때 안 죽도록 가드
 try:
@@ -21,30 +26,33 @@ except Exception:
 
 # --- 데이터 로딩 ---
 RAW_URL = './data/영화DB(임시).csv'
+STORE_DIR = './data/catalog_store'
+# 화면에서 쓰는 컬럼 (검색/필터, 목록 카드, 상세 페이지). 저장소에서는 이 컬럼만 읽음
+UI_COLUMNS = ['영화명', '장르', '국가', '개봉일', '상영시간', '배우', '감독', '제작사', '줄거리', 'url',
+              'TMDB 키워드', 'Gemini 키워드', '누적 관객수', '매력도', '예측 매력도', '유사작', '경쟁작']
 
-@st.cache_data
 def load_data():
-    """원격 CSV를 로드하고 '매력도'를 숫자형으로 변환 (실패 시 None 반환)."""
+    """카탈로그를 로드하고 관객수/관심도/평점/매력도를 숫자형으로 변환 (실패 시 None 반환).
+    CSV와 내용이 같은 컬럼 저장소가 있으면 CSV를 파싱하지 않고 저장소에서 UI_COLUMNS만 바로 읽습니다."""
     try:
-        # 인코딩 안전 시도
-        for enc in ("utf-8-sig", "cp949", "utf-8"):
-            try:
-                df = pd.read_csv(RAW_URL, encoding=enc)
-                break
-            except UnicodeDecodeError:
-                continue
-        else:
-            df = pd.read_csv(RAW_URL)
-
-        if "매력도" in df.columns:
-            df["매력도"] = pd.to_numeric(df["매력도"], errors="coerce")
-        return df
+        return normalize_catalog(load_catalog(RAW_URL, STORE_DIR, columns=UI_COLUMNS))
     except Exception:
         # 원격 실패 시 None (화면에서 업로더 폴백 처리)
         return None
 
-# 데이터프레임 로드
-df = load_data()
+@st.cache_resource
+def get_refresh_service():
+    """프로세스 전체가 공유하는 데이터 업데이트 작업자 (동시에 하나만 실행)"""
+    stage_names = [stage.name for stage in main.build_stages() if stage.enabled]
+    return RefreshService(run=lambda on_stage: main.main(on_stage=on_stage), load=load_data,
+                          stage_names=stage_names)
+
+# 데이터프레임 로드 (업데이트가 끝날 때마다 교체되는 스냅샷, 읽기 전용으로 사용)
+refresh_service = get_refresh_service()
+snapshot = refresh_service.snapshot()
+df = snapshot.df
+catalog_index = snapshot.index
+charm_distribution = snapshot.distribution
 
 
 if df is None:
@@ -62,8 +70,15 @@ if df is None:
         else:
             up.seek(0)
             df = pd.read_csv(up)
-        if "매력도" in df.columns:
-            df["매력도"] = pd.to_numeric(df["매력도"], errors="coerce")
+        df = normalize_catalog(df)
+        # 업로드한 파일마다 색인/분포를 한 번 만들어 필터/검색/페이지 이동/상세 페이지에 재사용
+        if st.session_state.get("upload_index_id") != up.file_id:
+            st.session_state.upload_index_id = up.file_id
+            st.session_state.upload_index = CatalogIndex(df)
+            st.session_state.upload_distribution = (Distribution(df["예측 매력도"])
+                                                    if "예측 매력도" in df.columns else None)
+        catalog_index = st.session_state.upload_index
+        charm_distribution = st.session_state.upload_distribution
         st.success("업로드한 CSV로 진행할게요.")
     else:
         st.stop()
@@ -89,16 +104,42 @@ with button_col:
         st.session_state.selected_movie_idx = None
         st.rerun()
 
-with st.sidebar:
+STAGE_ICONS = {"pending": "⏳", "running": "🔄", "done": "✅", "skipped": "⏭️", "disabled": "➖"}
+
+# 업데이트가 진행 중일 때만 1초마다 이 영역만 다시 그림 (검색 등 나머지 화면은 그대로 사용 가능)
+@st.fragment(run_every=1.0 if refresh_service.job is not None and refresh_service.job.running else None)
+def refresh_panel():
+    job = refresh_service.job
     if st.button("🔄 데이터 업데이트"):
-        with st.spinner("데이터를 수집하고 분석 중입니다..."):
-            try:
-                main.main()  
-                st.success("✅ 데이터 업데이트 완료!")
-                st.cache_data.clear()
-                st.rerun()
-            except Exception as e:
-                st.error(f"데이터 업데이트 중 오류 발생: {e}")
+        job, started = refresh_service.submit()
+        if not started:
+            st.session_state.refresh_joined = True
+        st.rerun()  # 진행 상황 자동 갱신을 켜기 위해 전체 화면 재실행
+
+    if job is None:
+        return
+    if job.running:
+        if st.session_state.get("refresh_joined"):
+            st.caption("이미 진행 중인 업데이트에 합류했습니다.")
+        st.progress(job.progress(), text="데이터를 수집하고 분석 중입니다...")
+        for name, stage in job.stages.items():
+            seconds = f" ({stage['seconds']:.1f}초)" if stage["seconds"] else ""
+            st.caption(f"{STAGE_ICONS.get(stage['status'], '')} {name}{seconds}")
+        return
+
+    st.session_state.refresh_joined = False
+    if job.state == "error":
+        st.error(f"데이터 업데이트 중 오류 발생: {job.error}")
+    else:
+        st.success("✅ 데이터 업데이트 완료!")
+    # 새 스냅샷이 나왔거나 자동 갱신이 아직 켜져 있으면 전체 화면을 다시 그려 반영
+    if refresh_service.snapshot().generation != snapshot.generation or st.session_state.get("refresh_polling"):
+        st.session_state.refresh_polling = False
+        st.rerun()
+
+st.session_state.refresh_polling = refresh_service.job is not None and refresh_service.job.running
+with st.sidebar:
+    refresh_panel()
 
 # ==========================================================
 # ---   메인 콘텐츠 표시 (상세 페이지 vs 메인 페이지) ---
@@ -111,7 +152,7 @@ if st.session_state.selected_movie_idx is not None:
         st.rerun()
 
     selected_row = df.iloc[st.session_state.selected_movie_idx]
-    show_movie_detail(selected_row, df)
+    show_movie_detail(selected_row, df, charm_distribution)
 
 # 2) 메인 페이지
 else:
@@ -179,23 +220,25 @@ else:
 
     st.markdown("---")
 
-    # 필터 수집 및 검색/필터 적용
-    filters = sidebar_filters(df)
-    results = search_movies(st.session_state.query, filters, df)
+    # 필터 수집 및 검색/필터 적용 (검색어/필터/정렬이 그대로면 이전 결과 커서와 페이지 위치를 재사용)
+    filters = sidebar_filters(df, catalog_index)
+    cursor = search_movies(st.session_state.query, filters, df, catalog_index,
+                           st.session_state.get("result_cursor"))
+    st.session_state.result_cursor = cursor
 
-    # 결과 표시
+    # 결과 표시 (현재 페이지만)
     if not st.session_state.query:
         st.markdown("### 전체 영화 목록 DB")
-        if results is None or results.empty:
+        if len(cursor) == 0:
             st.warning("선택한 필터에 해당하는 영화가 없습니다.")
         else:
-            display_movies_list(results, df)
+            display_movies_page(cursor, df, filters["limit"])
     else:
         st.markdown(f"**'{st.session_state.query}'**에 대한 검색 결과입니다. (필터 적용됨)")
-        if results is None or results.empty:
+        if len(cursor) == 0:
             st.info("선택한 조건에 맞는 검색 결과가 없습니다.")
         else:
-            display_movies_list(results, df)
+            display_movies_page(cursor, df, filters["limit"])
 
 
 
@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+
+from title_index import TitleIndex
+
+# 사이드바 필터 이름 → 콤마로 나뉜 값이 들어 있는 컬럼
+TOKEN_FACETS = {"장르": "장르", "국가": "국가", "키워드": "Gemini 키워드"}
+# 개봉일 앞 4자리로 거르는 필터
+YEAR_FACET = "개봉연도"
+FACETS = list(TOKEN_FACETS) + [YEAR_FACET]
+# 결과 정렬 기준 → (컬럼, 내림차순 여부). 관련도는 제목 검색 순위 (검색어가 없으면 원래 순서)
+RELEVANCE = "관련도"
+SORT_KEYS = {RELEVANCE: None, "예측 매력도": ("예측 매력도", True), "개봉일": ("개봉일", True)}
+
+_EMPTY = np.array([], dtype=np.int64)
+
+
+class _Facet:
+    """
+    필터 하나의 (값, 행) 쌍. values는 정렬된 값, rows[i]는 값 codes[i]를 가진 행 번호입니다.
+    totals는 값마다 행 수(필터 없을 때의 개수)입니다.
+    """
+
+    def __init__(self, keys):
+        # keys: 행 번호 인덱스를 가진 Series
+        frame = pd.DataFrame({"key": keys.to_numpy(dtype=object), "row": keys.index.to_numpy(dtype=np.int64)})
+        frame = frame.drop_duplicates()
+        codes, values = pd.factorize(frame["key"], sort=True)
+        self.values = np.asarray(values, dtype=object)
+        self.rows = frame["row"].to_numpy()
+        self.codes = codes.astype(np.int64)
+        self.totals = np.bincount(self.codes, minlength=len(self.values))
+
+    def postings(self):
+        """{값: 정렬된 행 번호 배열}"""
+        order = np.argsort(self.codes, kind="stable")
+        groups = np.split(self.rows[order], np.cumsum(self.totals)[:-1])
+        return dict(zip(self.values, groups))
+
+
+def _order(values, descending):
+    """값 순서대로 놓은 행 번호 (결측값은 맨 뒤, 같은 값은 원래 행 순서)"""
+    values = pd.Series(values.to_numpy())
+    if not pd.api.types.is_numeric_dtype(values.dtype):
+        values = values.astype("string")
+    order = values.sort_values(ascending=not descending, kind="stable", na_position="last").index
+    return order.to_numpy(dtype=np.int64)
+
+
+def _column(df, col):
+    # 행 번호(0..n-1) 인덱스, 결측값 제외
+    return pd.Series(df[col].to_numpy(dtype=object)).dropna()
+
+
+class CatalogIndex:
+    """
+    검색 필터용 역색인. 카탈로그(스냅샷)마다 한 번 만들어 두고 재사용합니다.
+    장르/국가/키워드는 콤마로 나눈 값마다, 개봉연도는 개봉일 앞 4자리마다 정렬된 행 번호 배열을 가지며
+    필터는 배열의 합집합(같은 필터 안)과 교집합(필터끼리)으로 계산합니다. (DataFrame 복사, 행 단위 함수 호출 없음)
+    정렬 기준마다 전체 행의 순서를 미리 계산해 두고, 결과는 그 순서에서 골라내기만 합니다.
+    사이드바의 값별 영화 수는 (값 번호, 행 번호) 쌍을 선택된 행 비트맵으로 거른 뒤 bincount로 셉니다.
+    제목 검색은 TitleIndex가 필터를 통과한 행 안에서 순위대로 찾습니다.
+    """
+
+    def __init__(self, df):
+        self.size = len(df)
+        self.titles = TitleIndex(df["영화명"]) if "영화명" in df.columns else None
+        self.facets = {}
+        for facet, col in TOKEN_FACETS.items():
+            if col in df.columns:
+                tokens = _column(df, col).astype(str).str.split(",").explode().str.strip()
+                self.facets[facet] = _Facet(tokens)
+        if "개봉일" in df.columns:
+            self.facets[YEAR_FACET] = _Facet(_column(df, "개봉일").astype(str).str[:4])
+        self.postings = {facet: data.postings() for facet, data in self.facets.items()}
+        self.orders = {sort: _order(df[key[0]], key[1]) for sort, key in SORT_KEYS.items()
+                       if key is not None and key[0] in df.columns}
+
+    def options(self, facet):
+        """필터에 나올 수 있는 값 목록 (정렬됨)"""
+        data = self.facets.get(facet)
+        return [] if data is None else data.values.tolist()
+
+    def rows_for(self, facet, values):
+        """values 중 하나라도 가진 행 번호 (정렬됨)"""
+        postings = self.postings.get(facet, {})
+        arrays = [postings[v] for v in values if v in postings]
+        if not arrays:
+            return _EMPTY
+        return arrays[0] if len(arrays) == 1 else np.flatnonzero(self._bitmap(arrays))
+
+    def _bitmap(self, arrays):
+        bitmap = np.zeros(self.size, dtype=bool)
+        for rows in arrays:
+            bitmap[rows] = True
+        return bitmap
+
+    def facet_counts(self, filters):
+        """
+        필터마다 (정렬된 값 배열, 값마다 영화 수)를 반환합니다.
+        영화 수는 그 필터를 뺀 나머지 선택을 모두 만족하는 행 중에서 셉니다. (같은 필터 안은 합집합이므로)
+        """
+        selected = {facet: self._bitmap([self.rows_for(facet, filters[facet])])
+                    for facet in FACETS if filters.get(facet)}
+        counts = {}
+        for facet, data in self.facets.items():
+            others = [bitmap for other, bitmap in selected.items() if other != facet]
+            if not others:
+                counts[facet] = (data.values, data.totals)
+                continue
+            mask = np.logical_and.reduce(others) if len(others) > 1 else others[0]
+            counts[facet] = (data.values, np.bincount(data.codes[mask[data.rows]], minlength=len(data.values)))
+        return counts
+
+    def select(self, filters):
+        """모든 필터를 만족하는 행 번호 (정렬됨). 선택된 필터가 없으면 None(전체)"""
+        rows = None
+        for facet in FACETS:
+            values = filters.get(facet)
+            if not values:
+                continue
+            matched = self.rows_for(facet, values)
+            rows = matched if rows is None else np.intersect1d(rows, matched, assume_unique=True)
+            if len(rows) == 0:
+                break
+        return rows
+
+    def _sorted(self, rows, sort):
+        """rows(행 번호, None이면 전체)를 sort 기준 순서로"""
+        order = self.orders[sort]
+        if rows is None:
+            return order
+        keep = np.zeros(self.size, dtype=bool)
+        keep[rows] = True
+        return order[keep[order]]
+
+    def search(self, query, filters, limit=None, sort=RELEVANCE):
+        """
+        필터를 모두 만족하는 행 번호를 sort 순서대로 최대 limit개(None이면 전부) 반환합니다.
+        관련도 순은 검색어가 있으면 제목 검색 순위(일치 → 앞부분 → 부분 → 유사)대로, 없으면 원래 순서대로입니다.
+        다른 기준에서는 검색어와 일치하는 제목(없으면 유사한 제목)을 그 기준으로 정렬합니다.
+        """
+        rows = self.select(filters)
+        ranked = sort not in self.orders
+        if query and self.titles is not None:
+            found = self.titles.search(query, rows, limit) if ranked else self.titles.search(query, rows, fill=1)
+            if found is not None:
+                if ranked:
+                    return found
+                rows = found
+        if not ranked:
+            return self._sorted(rows, sort)[:limit]
+        if rows is None:
+            rows = np.arange(self.size)
+        return rows[:limit]
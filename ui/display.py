@@ -2,11 +2,11 @@
 
 import pandas as pd
 import streamlit as st
-import matplotlib.pyplot as plt
-import seaborn as sns
-import matplotlib.font_manager as fm
-import platform
 import os, platform
+from functools import lru_cache
+
+from steps.normalize import is_count_text, parse_count
+from distribution import Distribution
 
 
 SHOW_FONT_WARNING = False 
@@ -14,8 +14,21 @@ SHOW_FONT_WARNING = False
 def set_korean_font() -> bool:
     """
     운영체제에 맞는 한글 폰트를 설정합니다.
-    Matplotlib 그래프에서 한글이 깨지는 현상을 방지합니다.
+    Matplotlib 그래프에서 한글이 깨지는 현상을 방지합니다. (폰트 탐색/설정은 프로세스당 한 번)
     """
+    if _load_korean_font():
+        return True
+    if SHOW_FONT_WARNING:
+        st.warning("한글 폰트 파일을 찾을 수 없습니다. 그래프의 한글이 깨질 수 있습니다.")
+    return False
+
+
+@lru_cache(maxsize=None)
+def _load_korean_font() -> bool:
+    # matplotlib은 상세 페이지에서 그래프를 처음 그릴 때 import (검색만 하는 경우 시작 시간 단축)
+    import matplotlib
+    import matplotlib.font_manager as fm
+
     system_os = platform.system()
     try:
         if system_os == "Windows":
@@ -33,40 +46,33 @@ def set_korean_font() -> bool:
             raise FileNotFoundError(font_path)
 
         font_prop = fm.FontProperties(fname=font_path)
-        plt.rc('font', family=font_prop.get_name())
-        plt.rcParams["axes.unicode_minus"] = False
+        matplotlib.rc('font', family=font_prop.get_name())
+        matplotlib.rcParams["axes.unicode_minus"] = False
         return True
 
     except FileNotFoundError:
-        
-        if SHOW_FONT_WARNING:
-            st.warning("한글 폰트 파일을 찾을 수 없습니다. 그래프의 한글이 깨질 수 있습니다.")
         return False
 
 
 def format_number_display(raw_value):
     """
-    다양한 숫자/문자 형식을 처리하여 천 단위 쉼표가 있는 문자열로 변환합니다.
-    'X만' 형식과 숫자형 데이터를 모두 처리합니다.
+    숫자를 천 단위 쉼표가 있는 문자열로 변환합니다.
+    불러올 때 normalize_catalog로 숫자형이 된 값을 그대로 받고, 남아 있는 'X억 X만' 문자열도 같은 규칙으로 처리합니다.
+    ('5만 미만' 같은 구간 이름 등 개수가 아닌 문자열은 그대로 반환)
     """
     if pd.isna(raw_value):
         return '-'
-    try:
-        
-        if '만' in str(raw_value):
-            num_part = float(str(raw_value).replace('만', ''))
-            value = int(num_part * 10000)
-            return f"{value:,}"
-       
-        else:
-            return f"{int(float(raw_value)):,}"
-    except (ValueError, TypeError):
-        
-        return str(raw_value)
+    if isinstance(raw_value, str) and not is_count_text(raw_value):
+        return raw_value
+    value = parse_count(raw_value)
+    return str(raw_value) if pd.isna(value) else f"{int(value):,}"
 
 
-def show_movie_detail(row, full_df):
-    """선택된 영화 한 편의 상세 정보를 모두 표시하는 함수"""
+def show_movie_detail(row, full_df, distribution=None):
+    """
+    선택된 영화 한 편의 상세 정보를 모두 표시하는 함수
+    distribution: full_df['예측 매력도']로 만든 Distribution (없으면 새로 만듦, 스냅샷마다 한 번 만들어 재사용 권장)
+    """
     set_korean_font()
 
     # --- 1. 포스터 및 기본 정보 ---
@@ -118,27 +124,17 @@ def show_movie_detail(row, full_df):
         st.markdown(gradient_text_html, unsafe_allow_html=True)
         
         charm_pred = row.get('예측 매력도', None)
-        if pd.notna(charm_pred):
-            all_charms = pd.to_numeric(full_df['예측 매력도'], errors='coerce').dropna()
-            fig, ax = plt.subplots(figsize=(10, 3))
-            sns.histplot(all_charms, ax=ax, bins=30, color="#EAEAEA", alpha=1)
-            
-            highlight_color = '#4B0082'
-            for patch in ax.patches:
-                x_min, x_max = patch.get_x(), patch.get_x() + patch.get_width()
-                if x_min <= charm_pred < x_max:
-                    patch.set_facecolor(highlight_color)
-                    bar_height = patch.get_height()
-                    ax.text(patch.get_x() + patch.get_width() / 2, bar_height, f'{int(charm_pred):,}\n', ha='center', va='bottom', color=highlight_color, fontweight='bold')
-                    break
-            
-            #ax.set_title("전체 작품 내 매력도 분포", fontsize=14, pad=20)
-            ax.set_yticks([])
-            ax.set_ylabel('')
-            ax.set_xlabel('')
-            for spine in ['top', 'right', 'left']:
-                ax.spines[spine].set_visible(False)
-            st.pyplot(fig)
+        if pd.notna(charm_pred) and distribution is None:
+            distribution = Distribution(full_df['예측 매력도'])
+        if pd.notna(charm_pred) and len(distribution):
+            # 전체 작품 내 매력도 분포 (미리 계산한 구간/순위, 구간마다 한 번만 그린 그림)
+            st.markdown(
+                f"<span style='color: #4B0082; font-weight: bold;'>{int(charm_pred):,}</span> "
+                f"· 전체 {len(distribution):,}편 중 {distribution.rank(charm_pred):,}위 "
+                f"(상위 {distribution.top_percent(charm_pred):.1f}%)",
+                unsafe_allow_html=True
+            )
+            st.image(distribution.image(charm_pred), use_container_width=True)
 
         # TMDB 키워드
         tmdb_keywords = str(row.get('TMDB 키워드', '')).strip()
@@ -195,6 +191,33 @@ def show_movie_detail(row, full_df):
             st.info("경쟁작 정보가 없습니다.")
 
 
+@st.fragment
+def display_movies_page(cursor, full_df, page_size):
+    """
+    검색 결과 커서(ResultCursor)의 현재 페이지만 그리는 함수.
+    이전/다음 버튼은 이 영역만 다시 그리며, 그 페이지의 영화만 df에서 꺼내 카드로 만듭니다.
+    """
+    # 페이지 이동은 버튼 콜백에서 (다시 그리기 전에 위치가 바뀌어 두 버튼의 활성 상태가 새 페이지 기준이 됨)
+    page = cursor.page_number(page_size)
+    prev_col, info_col, next_col = st.columns([1, 4, 1])
+    with prev_col:
+        st.button("◀ 이전", disabled=page == 0, use_container_width=True,
+                  on_click=cursor.move, args=(-1, page_size))
+    with next_col:
+        st.button("다음 ▶", disabled=page >= cursor.page_count(page_size) - 1, use_container_width=True,
+                  on_click=cursor.move, args=(1, page_size))
+
+    first = page * page_size
+    last = min(first + page_size, len(cursor))
+    with info_col:
+        st.markdown(
+            f"<div style='text-align: center;'>전체 {len(cursor):,}편 중 {first + 1:,}–{last:,}번째 "
+            f"({page + 1:,} / {cursor.page_count(page_size):,} 페이지)</div>",
+            unsafe_allow_html=True
+        )
+    display_movies_list(cursor.page(full_df, page_size), full_df)
+
+
 def display_movies_list(results_df, full_df):
     """
     전체 3열 그리드 안에 각 영화 정보를
@@ -232,8 +255,8 @@ def display_movies_list(results_df, full_df):
                 ai_keywords = row.get('Gemini 키워드', '정보 없음')
                 st.markdown(f"<small>✨ AI키워드: {ai_keywords}</small>", unsafe_allow_html=True)
 
-                viewer_predict = row.get('예측 매력도', '정보 없음')
-                st.markdown(f"<small>✨ AI매력도: {int(viewer_predict)}</small>", unsafe_allow_html=True)
+                viewer_predict = row.get('예측 매력도')
+                st.markdown(f"<small>✨ AI매력도: {format_number_display(viewer_predict)}</small>", unsafe_allow_html=True)
                 
                 if st.button("상세보기", key=f"detail_{row.name}"):
                     st.session_state.selected_movie_idx = row.name
@@ -0,0 +1,69 @@
+import io
+import threading
+
+import numpy as np
+import pandas as pd
+
+# 상세 페이지 매력도 분포 그래프
+BINS = 30
+BAR_COLOR = "#EAEAEA"
+HIGHLIGHT_COLOR = "#4B0082"
+
+
+class Distribution:
+    """
+    컬럼 하나(예측 매력도)의 분포 요약. 카탈로그(스냅샷)마다 한 번 만들어 모든 세션이 공유합니다.
+    - 히스토그램 구간/개수 (값 범위를 BINS개로 나눔)
+    - 정렬된 값: top_percent()/rank()가 이진 탐색으로 바로 계산
+    - 강조할 구간마다 한 번만 그린 PNG (구간 수만큼만 보관, pyplot을 쓰지 않아 그림이 쌓이지 않음)
+    """
+
+    def __init__(self, values, bins=BINS):
+        values = pd.to_numeric(pd.Series(values), errors="coerce").dropna().to_numpy(dtype=np.float64)
+        self.sorted = np.sort(values)
+        if len(values):
+            self.counts, self.edges = np.histogram(values, bins=bins)
+        else:
+            self.counts, self.edges = np.zeros(0, dtype=np.int64), np.zeros(1)
+        self._images = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.sorted)
+
+    def bin_of(self, value):
+        """value가 속한 구간 번호 (마지막 구간은 최댓값 포함)"""
+        position = int(np.searchsorted(self.edges, value, side="right")) - 1
+        return min(max(position, 0), len(self.counts) - 1)
+
+    def rank(self, value):
+        """value보다 큰 값 수 + 1 (1위가 가장 큼)"""
+        return len(self.sorted) - int(np.searchsorted(self.sorted, value, side="right")) + 1
+
+    def top_percent(self, value):
+        """value 이상인 값의 비율 (%, 상위 몇 %인지)"""
+        return 100.0 * (len(self.sorted) - int(np.searchsorted(self.sorted, value, side="left"))) / len(self.sorted)
+
+    def image(self, value):
+        """value가 속한 구간을 강조한 히스토그램 PNG (bytes)"""
+        highlight = self.bin_of(value)
+        with self._lock:
+            png = self._images.get(highlight)
+            if png is None:
+                png = self._images[highlight] = self._render(highlight)
+            return png
+
+    def _render(self, highlight):
+        from matplotlib.figure import Figure  # 그래프를 처음 그릴 때만 import
+        fig = Figure(figsize=(10, 3))
+        ax = fig.subplots()
+        colors = [BAR_COLOR] * len(self.counts)
+        colors[highlight] = HIGHLIGHT_COLOR
+        ax.bar(self.edges[:-1], self.counts, width=np.diff(self.edges), align="edge",
+               color=colors, edgecolor="white", linewidth=0.5)
+        ax.set_yticks([])
+        for spine in ["top", "right", "left"]:
+            ax.spines[spine].set_visible(False)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", dpi=100, bbox_inches="tight")
+        return buffer.getvalue()
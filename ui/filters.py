@@ -1,23 +1,43 @@
 import streamlit as st
 
-def sidebar_filters(df):
-    genre_options = sorted({g.strip() for genres in df['장르'].dropna() for g in str(genres).split(',')})
-    year_options = sorted({str(y)[:4] for y in df['개봉일'].dropna()}, reverse=True)
-    country_options = sorted({c.strip() for countries in df['국가'].dropna() for c in str(countries).split(',')})
-    keyword_options = sorted({kw.strip() for kws in df['Gemini 키워드'].dropna() for kw in str(kws).split(',')})
+from catalog_index import SORT_KEYS, CatalogIndex
+
+# 사이드바 필터 이름 → 위젯 키 (선택값을 다른 필터의 개수 계산에 먼저 씀)
+FILTER_KEYS = {"장르": "filter_genre", "개봉연도": "filter_year", "국가": "filter_country", "키워드": "filter_keyword"}
+
+def _filter_options(values, counts, selected, reverse=False):
+    """결과가 있는 값과 이미 선택한 값만 남긴 목록과 '값 (개수)' 라벨"""
+    labels = {v: f"{v} ({int(c):,})" for v, c in zip(values, counts) if c > 0}
+    for v in selected:
+        labels.setdefault(v, f"{v} (0)")
+    options = sorted(labels, reverse=reverse)
+    return options, labels
+
+def sidebar_filters(df, index=None):
+    # index: df로 만든 CatalogIndex (없으면 새로 만듦, 스냅샷마다 한 번 만들어 재사용 권장)
+    if index is None:
+        index = CatalogIndex(df)
+    selected = {facet: st.session_state.get(key, []) for facet, key in FILTER_KEYS.items()}
+    counts = index.facet_counts(selected)
+
+    widgets = {}
+    for facet in FILTER_KEYS:
+        values, facet_counts = counts.get(facet, ([], []))
+        widgets[facet] = _filter_options(values, facet_counts, selected[facet], reverse=facet == "개봉연도")
 
     with st.sidebar:
         st.markdown("## 🎛️ 조건 설정")
-        selected_genres = st.multiselect("장르", genre_options)
-        selected_years = st.multiselect("개봉연도", year_options)
-        selected_countries = st.multiselect("국가", country_options)
-        selected_keyword = st.multiselect("키워드", keyword_options)
-        limit = st.slider("영화 개수", 1, 30, 10)
+        for facet, (options, labels) in widgets.items():
+            selected[facet] = st.multiselect(facet, options, key=FILTER_KEYS[facet],
+                                             format_func=lambda v, labels=labels: labels[v])
+        sort = st.selectbox("정렬", list(SORT_KEYS))
+        limit = st.slider("페이지당 영화 개수", 3, 30, 12, step=3)
 
     return {
-        "장르": selected_genres,
-        "개봉연도": selected_years,
-        "국가": selected_countries,
-        "키워드": selected_keyword,
+        "장르": selected["장르"],
+        "개봉연도": selected["개봉연도"],
+        "국가": selected["국가"],
+        "키워드": selected["키워드"],
+        "sort": sort,
         "limit": limit
     }
\ No newline at end of file
@@ -0,0 +1,113 @@
+import threading
+import time
+
+from catalog_index import CatalogIndex
+from distribution import Distribution
+
+
+class RefreshJob:
+    """백그라운드 데이터 업데이트 한 번의 진행 상태 (단계별 상태/소요 시간)"""
+
+    def __init__(self, stage_names):
+        self.stages = {name: {"status": "pending", "seconds": None} for name in stage_names}
+        self.state = "running"          # running / done / error
+        self.error = None
+        self.started_at = time.time()
+        self.finished_at = None
+
+    def on_stage(self, name, status, seconds):
+        # main.main(on_stage=...) 콜백 (작업 스레드에서 호출됨)
+        self.stages[name] = {"status": status, "seconds": seconds}
+
+    @property
+    def running(self):
+        return self.state == "running"
+
+    def progress(self):
+        """끝난 단계 비율 (0~1)"""
+        finished = sum(s["status"] in ("done", "skipped", "disabled") for s in self.stages.values())
+        return finished / len(self.stages) if self.stages else 0.0
+
+
+class Snapshot:
+    """화면에 보여줄 카탈로그 한 벌. 업데이트가 끝나면 새 Snapshot으로 통째로 교체됩니다."""
+
+    def __init__(self, generation, df):
+        self.generation = generation
+        self.df = df
+        self.loaded_at = time.time()
+        self._index = None
+        self._distribution = None
+        self._index_lock = threading.Lock()
+
+    @property
+    def index(self):
+        """검색 필터용 CatalogIndex (처음 사용할 때 한 번만 만듦, 모든 세션이 공유)"""
+        with self._index_lock:
+            if self._index is None and self.df is not None:
+                self._index = CatalogIndex(self.df)
+            return self._index
+
+    @property
+    def distribution(self):
+        """상세 페이지의 예측 매력도 분포 요약 (처음 사용할 때 한 번만 만듦, 모든 세션이 공유)"""
+        with self._index_lock:
+            if self._distribution is None and self.df is not None and "예측 매력도" in self.df.columns:
+                self._distribution = Distribution(self.df["예측 매력도"])
+            return self._distribution
+
+
+class RefreshService:
+    """
+    데이터 업데이트를 한 번에 하나만 실행하는 백그라운드 작업자 (프로세스당 하나, 모든 세션이 공유).
+    - submit(): 실행 중인 작업이 있으면 새로 시작하지 않고 그 작업에 합류합니다.
+    - run(on_stage)이 끝나면 load()로 새 카탈로그를 읽어 스냅샷을 교체합니다.
+      읽는 쪽은 교체 전 또는 후의 스냅샷 중 하나만 보므로 쓰는 중인 파일을 읽지 않습니다.
+    """
+
+    def __init__(self, run, load, stage_names):
+        self._run = run
+        self._load = load
+        self._stage_names = list(stage_names)
+        self._lock = threading.Lock()
+        self._job = None
+        self._snapshot = None
+
+    def snapshot(self):
+        """현재 스냅샷 (처음 호출 시 로드, 로드에 실패했다면 다시 시도)"""
+        with self._lock:
+            if self._snapshot is None or self._snapshot.df is None:
+                generation = self._snapshot.generation if self._snapshot else 0
+                self._snapshot = Snapshot(generation, self._load())
+            return self._snapshot
+
+    @property
+    def job(self):
+        """가장 최근 작업 (없으면 None)"""
+        return self._job
+
+    def submit(self):
+        """(작업, 새로 시작했는지)"""
+        with self._lock:
+            if self._job is not None and self._job.running:
+                return self._job, False
+            job = RefreshJob(self._stage_names)
+            self._job = job
+        threading.Thread(target=self._work, args=(job,), name="data-refresh", daemon=True).start()
+        return job, True
+
+    def _work(self, job):
+        try:
+            self._run(job.on_stage)
+            snapshot = Snapshot(None, self._load())
+            snapshot.index  # 교체 전에 색인/분포까지 만들어 두어 화면 쪽에서 기다리지 않도록
+            snapshot.distribution
+            with self._lock:
+                snapshot.generation = self._snapshot.generation + 1 if self._snapshot else 1
+                self._snapshot = snapshot
+            job.state = "done"
+        except Exception as e:
+            job.error = e
+            job.state = "error"
+        finally:
+            job.finished_at = time.time()
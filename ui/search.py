@@ -1,29 +1,46 @@
-import pandas as pd
-
-def search_movies(query, filters, df):
-    filtered = df.copy()
-    if query:
-        filtered = filtered[filtered['영화명'].str.contains(query, case=False, na=False)]
-    if filters["장르"]:
-        filtered = filtered[filtered['장르'].apply(
-            lambda x: any(g in [genre.strip() for genre in str(x).split(',')] for g in filters["장르"]) if pd.notna(x) else False
-        )]
-    if filters["개봉연도"]:
-        filtered = filtered[
-            filtered['개봉일'].apply(
-                lambda x: str(x)[:4] in filters["개봉연도"]
-            )
-        ]
-    if filters["국가"]:
-        filtered = filtered[
-            filtered['국가'].apply(
-                lambda x: any(country == c.strip() for c in str(x).split(',') for country in filters["국가"]) if pd.notna(x) else False
-            )
-        ]
-    if filters["키워드"]:
-        filtered = filtered[
-            filtered['Gemini 키워드'].apply(
-                lambda x: any(kw == k.strip() for k in str(x).split(',') for kw in filters["키워드"]) if pd.notna(x) else False
-            )
-        ]
-    return filtered.head(filters["limit"])
\ No newline at end of file
+from catalog_index import FACETS, RELEVANCE, CatalogIndex
+
+class ResultCursor:
+    """
+    검색 결과 전체의 정렬된 행 번호와 현재 위치(화면 첫 영화의 순번).
+    세션에 두고 검색어/필터/정렬이 같으면 그대로 재사용하며, 페이지마다 그 페이지의 행만 df에서 꺼냅니다.
+    """
+
+    def __init__(self, key, index, rows):
+        self.key = key
+        self.index = index
+        self.rows = rows
+        self.start = 0
+
+    def __len__(self):
+        return len(self.rows)
+
+    def page_count(self, size):
+        return max(1, -(-len(self.rows) // size))
+
+    def page_number(self, size):
+        """현재 페이지 번호 (0부터, 페이지 크기가 바뀌어도 보던 영화가 있는 페이지)"""
+        return min(self.start // size, self.page_count(size) - 1)
+
+    def move(self, pages, size):
+        page = min(max(self.page_number(size) + pages, 0), self.page_count(size) - 1)
+        self.start = page * size
+
+    def page(self, df, size):
+        """현재 페이지의 영화들 (df.iloc으로 이 페이지 행만 꺼냄)"""
+        start = self.page_number(size) * size
+        return df.iloc[self.rows[start:start + size]]
+
+def search_movies(query, filters, df, index=None, cursor=None):
+    """
+    검색어와 필터에 맞는 결과 커서(ResultCursor)를 반환합니다. (filters["sort"] 순서, 결과 수 제한 없음)
+    index: df로 만든 CatalogIndex (없으면 새로 만듦, 스냅샷마다 한 번 만들어 재사용 권장)
+    cursor: 이전 실행의 커서. 같은 색인에서 검색어/필터/정렬이 같으면 다시 검색하지 않고 그대로 반환 (페이지 위치 유지)
+    """
+    if index is None:
+        index = CatalogIndex(df)
+    sort = filters.get("sort", RELEVANCE)
+    key = (query, sort, tuple(tuple(filters.get(facet) or ()) for facet in FACETS))
+    if cursor is not None and cursor.index is index and cursor.key == key:
+        return cursor
+    return ResultCursor(key, index, index.search(query, filters, sort=sort))
\ No newline at end of file
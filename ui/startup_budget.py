@@ -0,0 +1,76 @@
+import ast
+import os
+import subprocess
+import sys
+
+UI_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(UI_DIR)
+APP_PATH = os.path.join(UI_DIR, "app.py")
+# 앱 시작 시 import 시간 예산 (밀리초)
+DEFAULT_BUDGET_MS = 1500
+# 처음 사용할 때만 import해야 하는 무거운 패키지 (시작 시 로드되면 예산과 관계없이 실패)
+LAZY_MODULES = ["sklearn", "scipy", "matplotlib", "seaborn", "numba", "selenium", "bs4"]
+
+
+def app_imports(app_path=APP_PATH):
+    """app.py가 모듈 수준에서 import하는 모듈 이름 (try 블록 안 포함, 함수 안 import 제외)"""
+    tree = ast.parse(open(app_path, encoding="utf-8").read())
+    names = []
+    statements = list(tree.body)
+    while statements:
+        node = statements.pop(0)
+        if isinstance(node, ast.Import):
+            names += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.append(node.module)
+        elif isinstance(node, ast.Try):
+            statements = node.body + statements
+    return list(dict.fromkeys(names))
+
+
+def measure(modules):
+    """
+    새 파이썬 프로세스에서 modules를 app.py와 같은 경로 설정으로 import하며 -X importtime 결과를 모읍니다.
+    ({최상위 모듈: 누적 마이크로초}, 로드된 모든 모듈 이름 집합)
+    """
+    code = "\n".join([f"import sys; sys.path[:0] = [{UI_DIR!r}, {ROOT_DIR!r}]"] +
+                     [f"try:\n    import {name}\nexcept ImportError:\n    pass" for name in modules])
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT_DIR,
+                            capture_output=True, text=True, check=True)
+    top_level, loaded = {}, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        loaded.add(name.strip())
+        if not name.startswith("  "):  # 들여쓰기 1칸 = 직접 import한 모듈
+            top_level[name.strip()] = int(cumulative)
+    return top_level, loaded
+
+
+def check(budget_ms=DEFAULT_BUDGET_MS, repeat=3):
+    """
+    앱 시작 import 시간을 repeat번 재서 가장 짧은 값을 예산과 비교합니다.
+    (통과 여부, 총 밀리초, {최상위 모듈: 밀리초}, 시작 시 로드된 LAZY_MODULES)
+    """
+    modules = app_imports()
+    runs = [measure(modules) for _ in range(repeat)]
+    top_level, loaded = min(runs, key=lambda run: sum(run[0].values()))
+    total_ms = sum(top_level.values()) / 1000
+    eager = [name for name in LAZY_MODULES if name in loaded]
+    by_module = {name: us / 1000 for name, us in sorted(top_level.items(), key=lambda item: -item[1])}
+    return total_ms <= budget_ms and not eager, total_ms, by_module, eager
+
+
+if __name__ == "__main__":
+    # 사용법: python ui/startup_budget.py [예산 ms]
+    # 예산을 넘거나 LAZY_MODULES가 시작 시 로드되면 종료 코드 1
+    budget_ms = float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_BUDGET_MS
+    ok, total_ms, by_module, eager = check(budget_ms)
+    for name, ms in list(by_module.items())[:10]:
+        print(f"{name:>30}: {ms:8.1f}ms")
+    print(f"앱 시작 import 시간: {total_ms:.0f}ms (예산 {budget_ms:.0f}ms)")
+    if eager:
+        print(f"❌ 처음 사용할 때 import해야 하는 패키지가 시작 시 로드됨: {', '.join(eager)}")
+    print("✅ 예산 안" if ok else "❌ 예산 초과")
+    sys.exit(0 if ok else 1)
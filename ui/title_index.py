@@ -0,0 +1,259 @@
+import sys
+import time
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+# 한글 음절 = 0xAC00 + (초성 * 21 + 중성) * 28 + 종성
+_HANGUL_BASE, _HANGUL_COUNT = 0xAC00, 11172
+_CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNGSEONG = ["ㅏ", "ㅐ", "ㅑ", "ㅒ", "ㅓ", "ㅔ", "ㅕ", "ㅖ", "ㅗ", "ㅗㅏ", "ㅗㅐ", "ㅗㅣ", "ㅛ", "ㅜ", "ㅜㅓ",
+              "ㅜㅔ", "ㅜㅣ", "ㅠ", "ㅡ", "ㅡㅣ", "ㅣ"]
+_JONGSEONG = ["", "ㄱ", "ㄲ", "ㄱㅅ", "ㄴ", "ㄴㅈ", "ㄴㅎ", "ㄷ", "ㄹ", "ㄹㄱ", "ㄹㅁ", "ㄹㅂ", "ㄹㅅ", "ㄹㅌ",
+              "ㄹㅍ", "ㄹㅎ", "ㅁ", "ㅂ", "ㅂㅅ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+# 겹모음/겹받침 낱자 (사용자가 직접 입력한 경우)
+_COMPOUND_JAMO = {"ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+                  "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ",
+                  "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ"}
+
+_JAMO_TABLE = {ord(k): v for k, v in _COMPOUND_JAMO.items()}
+_CHOSEONG_TABLE = {}
+for _code in range(_HANGUL_COUNT):
+    _cho, _rest = divmod(_code, 21 * 28)
+    _jung, _jong = divmod(_rest, 28)
+    _JAMO_TABLE[_HANGUL_BASE + _code] = _CHOSEONG[_cho] + _JUNGSEONG[_jung] + _JONGSEONG[_jong]
+    _CHOSEONG_TABLE[_HANGUL_BASE + _code] = _CHOSEONG[_cho]
+
+# 초성 검색으로 보는 낱자 (ㄱ~ㅎ)
+_CONSONANTS = set(_CHOSEONG)
+# 검색 순위: 일치, 앞부분 일치, 부분 일치 (그다음 유사)
+EXACT, PREFIX, SUBSTRING = 0, 1, 2
+# 유사 검색: 검색어 자모 3-gram 중 이 비율 이상을 가진 제목 (3-gram이 FUZZY_MIN_GRAMS개 이상인 검색어만)
+FUZZY_THRESHOLD = 0.5
+FUZZY_MIN_GRAMS = 4
+
+
+def normalize_title(text):
+    """검색용 제목 키: NFC, 소문자, 공백 제거"""
+    return "".join(unicodedata.normalize("NFC", text).lower().split())
+
+
+def decompose(text):
+    """'어벤져스' → 'ㅇㅓㅂㅔㄴㅈㅕㅅㅡ' (겹모음/겹받침도 낱자로, 한글이 아닌 문자는 그대로)"""
+    return text.translate(_JAMO_TABLE)
+
+
+def choseong(text):
+    """'어벤져스 2' → 'ㅇㅂㅈㅅ2'"""
+    return text.translate(_CHOSEONG_TABLE)
+
+
+# gram 한 글자당 비트 수 (유니코드 코드 포인트 < 2**21, 3글자까지 uint64 하나에 들어감)
+_BITS = np.uint64(21)
+
+
+def _gram_id(text):
+    """최대 3글자 문자열 → 정수 id (글자 수가 다르면 id도 겹치지 않음)"""
+    gram_id = 0
+    for ch in text:
+        gram_id = (gram_id << 21) | ord(ch)
+    return gram_id
+
+
+def _grams(key, n):
+    return {_gram_id(key[i:i + n]) for i in range(len(key) - n + 1)}
+
+
+def _group(values, rows):
+    """(값, 행 번호) 쌍 → {값: 정렬된 고유 행 번호 배열}"""
+    if len(values) == 0:
+        return {}
+    codes, uniques = pd.factorize(values)
+    width = np.int64(rows.max()) + 1
+    pairs = np.sort(codes.astype(np.int64) * width + rows)
+    pairs = pairs[np.concatenate([[True], np.diff(pairs) != 0])]   # 같은 키 안에서 반복된 gram
+    codes, rows = np.divmod(pairs, width)
+    bounds = np.flatnonzero(np.diff(codes)) + 1
+    return dict(zip(uniques.tolist(), np.split(rows, bounds)))
+
+
+_NONE = np.array([], dtype=np.int64)
+
+
+class _GramIndex:
+    """
+    문자열 목록에 대한 부분 문자열 검색 색인.
+    - postings: shortest~n 글자 gram → 행 번호 (n보다 짧은 검색어는 그 자체가 gram이므로 목록 하나로 바로 찾음)
+    - prefixes: 앞 shortest~n 글자 → 행 번호, key_codes: 키 전체의 번호 (순위 계산용)
+    모든 키를 코드 포인트 배열 하나로 이어 붙여 gram id를 numpy로 한 번에 계산합니다. (n <= 3)
+    """
+
+    def __init__(self, keys, n, shortest=1):
+        self.n = n
+        self.shortest = shortest
+        self.keys = pd.Series(keys, dtype=object)
+        lengths = np.fromiter(map(len, keys), dtype=np.int64, count=len(keys))
+        chars = np.frombuffer("".join(keys).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        owner = np.repeat(np.arange(len(keys), dtype=np.int64), lengths)
+        position = np.arange(len(chars)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        gram_ids, gram_rows, prefix_ids, prefix_rows = [], [], [], []
+        for size in range(shortest, n + 1):
+            at = np.flatnonzero(position + size <= lengths[owner])
+            ids = chars[at]
+            for offset in range(1, size):
+                ids = (ids << _BITS) | chars[at + offset]
+            gram_ids.append(ids)
+            gram_rows.append(owner[at])
+            first = position[at] == 0
+            prefix_ids.append(ids[first])
+            prefix_rows.append(owner[at][first])
+        self.postings = _group(np.concatenate(gram_ids), np.concatenate(gram_rows))
+        self.prefixes = _group(np.concatenate(prefix_ids), np.concatenate(prefix_rows))
+        codes, uniques = pd.factorize(np.asarray(keys, dtype=object))
+        self.key_codes = codes
+        self.key_numbers = {key: i for i, key in enumerate(uniques.tolist())}
+        self.gram_counts = np.maximum(lengths - n + 1, 0)
+
+    @staticmethod
+    def _lookup(table, key, allowed):
+        rows = table.get(key, _NONE)
+        return rows if allowed is None else np.intersect1d(rows, allowed, assume_unique=True)
+
+    def candidates(self, query, allowed=None):
+        """query의 n-gram을 모두 가진 행 번호 (정렬됨, 실제로 포함하는지는 확인 전)"""
+        arrays = []
+        for gram in _grams(query, self.n):
+            if gram not in self.postings:
+                return _NONE
+            arrays.append(self.postings[gram])
+        if allowed is not None:
+            arrays.append(allowed)
+        arrays.sort(key=len)
+        rows = arrays[0]
+        for other in arrays[1:]:
+            if len(rows) == 0:
+                break
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows
+
+    def match(self, query, allowed=None):
+        """(행 번호, 순위) — query를 부분 문자열로 가진 행과 EXACT/PREFIX/SUBSTRING 순위"""
+        exact = np.flatnonzero(self.key_codes == self.key_numbers.get(query, -1))
+        if allowed is not None:
+            exact = np.intersect1d(exact, allowed, assume_unique=True)
+        if self.shortest <= len(query) <= self.n:
+            prefix = self._lookup(self.prefixes, _gram_id(query), allowed)
+            substring = self._lookup(self.postings, _gram_id(query), allowed)
+        else:
+            rows = self.candidates(query, allowed) if len(query) > self.n else (
+                np.arange(len(self.keys)) if allowed is None else allowed)
+            found = self.keys.iloc[rows].str.find(query).to_numpy()
+            prefix, substring = rows[found == 0], rows[found >= 0]
+        prefix = np.setdiff1d(prefix, exact, assume_unique=True)
+        substring = np.setdiff1d(substring, np.union1d(exact, prefix), assume_unique=True)
+        rows = np.concatenate([exact, prefix, substring])
+        tiers = np.repeat([EXACT, PREFIX, SUBSTRING], [len(exact), len(prefix), len(substring)])
+        return rows, tiers
+
+    def similar(self, query, allowed=None):
+        """
+        (행 번호, 점수) — 검색어 n-gram 중 FUZZY_THRESHOLD 이상을 가진 행 (검색어가 짧으면 찾지 않음)
+        점수가 높은 순, 같으면 짧은 키 순으로 정렬되어 있습니다.
+        """
+        query_grams = _grams(query, self.n)
+        if len(query_grams) < FUZZY_MIN_GRAMS:
+            return _NONE
+        found = [self.postings[g] for g in query_grams if g in self.postings]
+        if not found:
+            return _NONE
+        shared = np.bincount(np.concatenate(found), minlength=len(self.keys))
+        rows = np.flatnonzero(shared >= FUZZY_THRESHOLD * len(query_grams))
+        if allowed is not None:
+            rows = np.intersect1d(rows, allowed, assume_unique=True)
+        return rows[np.lexsort((rows, self.gram_counts[rows], -shared[rows]))]
+
+
+class TitleIndex:
+    """
+    영화 제목 검색 색인. 카탈로그(스냅샷)마다 한 번 만들어 두고 재사용합니다.
+    - 제목(소문자, 공백 제거)의 2-gram: 일반 검색
+    - 자모로 분해한 제목의 3-gram: 입력 중인 글자('어벤ㅈ'), 유사 검색(오타)
+    - 초성의 2-gram: 'ㅇㅂㅈㅅ' → 어벤져스
+    결과는 일치 → 앞부분 일치 → 부분 일치 → 자모 단위 일치 → 유사 순서이며, 같은 순위는 원래 행 순서입니다.
+    """
+
+    def __init__(self, titles):
+        keys = (pd.Series(titles, dtype=object).fillna("").astype(str)
+                .str.normalize("NFC").str.lower().str.replace(r"\s+", "", regex=True).tolist())
+        self.size = len(keys)
+        self.titles = _GramIndex(keys, 2)
+        # 한 글자 검색어(영문/숫자/낱자)도 목록 하나로 바로 찾도록 1글자 gram부터 색인
+        self.jamo = _GramIndex([decompose(k) for k in keys], 3)
+        self.choseong = _GramIndex([choseong(k) for k in keys], 2)
+
+    def search(self, query, allowed=None, limit=None, fill=None):
+        """
+        query에 맞는 행 번호를 순위대로 반환합니다. (검색어가 비어 있으면 None)
+        allowed(정렬된 행 번호)가 주어지면 그 안에서만 찾습니다.
+        일치하는 제목이 fill개(기본: limit, 둘 다 None이면 항상)보다 적을 때만 유사한 제목을 덧붙입니다.
+        """
+        fill = limit if fill is None else fill
+        query = normalize_title(query)
+        if not query:
+            return None
+        if set(query) <= _CONSONANTS:
+            rows, tiers = self.choseong.match(query, allowed)
+            return rows[np.lexsort((rows, tiers))][:limit]
+
+        rows, tiers = self.titles.match(query, allowed)
+        # 자모 단위로만 일치하는 제목 (마지막 글자를 입력하는 중인 경우 등)은 글자 그대로 일치하는 제목 뒤에
+        jamo_query = decompose(query)
+        jamo_rows, jamo_tiers = self.jamo.match(jamo_query, allowed)
+        extra = ~np.isin(jamo_rows, rows, assume_unique=True)
+        rows = np.concatenate([rows, jamo_rows[extra]])
+        tiers = np.concatenate([tiers, jamo_tiers[extra]])
+        via_jamo = np.concatenate([np.zeros(len(rows) - extra.sum(), dtype=bool), np.ones(extra.sum(), dtype=bool)])
+        ranked = rows[np.lexsort((rows, tiers, via_jamo))]
+        if fill is not None and len(ranked) >= fill:
+            return ranked[:limit]
+
+        # 일치하는 제목이 부족하면 자모 3-gram이 많이 겹치는 제목으로 보충 (오타)
+        fuzzy = self.jamo.similar(jamo_query, allowed)
+        return np.concatenate([ranked, fuzzy[~np.isin(fuzzy, ranked)]])[:limit]
+
+
+def benchmark(titles, queries, repeat=5, limit=30):
+    """
+    타이핑하듯 늘어나는 검색어들에 대해 기존 str.contains 검색과 TitleIndex 검색의 평균 시간(초)을 비교합니다.
+    [(검색어, str.contains 초, TitleIndex 초, str.contains 결과 수, TitleIndex 결과 수)]
+    """
+    series = pd.Series(titles)
+    index = TitleIndex(titles)
+    rows = []
+    for query in queries:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            contains = series[series.str.contains(query, case=False, na=False)].head(limit)
+        middle = time.perf_counter()
+        for _ in range(repeat):
+            found = index.search(query, limit=limit)
+        end = time.perf_counter()
+        rows.append((query, (middle - start) / repeat, (end - middle) / repeat, len(contains), len(found)))
+    return rows
+
+
+if __name__ == "__main__":
+    # 사용법: python ui/title_index.py [CSV 경로] [배수]
+    # 카탈로그 제목을 배수만큼 반복하고 ' <반복 번호>'를 붙여 서로 다른 제목으로 만든 뒤 비교
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else "./data/영화DB(임시).csv"
+    times = int(sys.argv[2]) if len(sys.argv) > 2 else 700
+    base = pd.read_csv(csv_path)["영화명"].astype(str)
+    titles = pd.concat([base + f" {i}" for i in range(times)], ignore_index=True)
+    start = time.perf_counter()
+    TitleIndex(titles)
+    print(f"제목 {len(titles):,}개 색인: {time.perf_counter() - start:.2f}초")
+    queries = ["어", "어벤", "어벤ㅈ", "어벤져", "어벤져스", "ㅇㅂㅈㅅ", "어밴져스", "the", "의"]
+    for query, contains, indexed, n_contains, n_indexed in benchmark(titles, queries):
+        print(f"{query!r:>12}: str.contains {contains * 1000:8.1f}ms ({n_contains}건)  "
+              f"TitleIndex {indexed * 1000:7.1f}ms ({n_indexed}건)")